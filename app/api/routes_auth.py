@@ -1,13 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
-from app.core.security import create_token, hash_password, verify_password
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import create_token, hash_password, verify_password, password_needs_rehash
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, invalidate_cached_user, CurrentUser
 from app.database.models import User
 
 router = APIRouter()
 
+# Unique index (PostgreSQL constraint name) or SQLite message -> the field it guards
+_UNIQUE_FIELDS = {
+    "ix_users_username": "username",
+    "ix_users_email": "email",
+    "UNIQUE constraint failed: users.username": "username",
+    "UNIQUE constraint failed: users.email": "email",
+}
+
+
+def _duplicate_field(exc: IntegrityError) -> Optional[str]:
+    """
+    Name the users column whose unique index rejected the insert, None if
+    the error is anything else (the driver message alone can't be trusted:
+    PostgreSQL's DETAIL line echoes the submitted values)
+    """
+    orig = exc.orig
+    # asyncpg exposes constraint_name on the wrapped error, psycopg on .diag
+    for source in (orig, getattr(orig, '__cause__', None), getattr(orig, 'diag', None)):
+        constraint = getattr(source, 'constraint_name', None)
+        if constraint:
+            return _UNIQUE_FIELDS.get(constraint)
+    return _UNIQUE_FIELDS.get(str(orig))
+
 class AuthInput(BaseModel):
     username: str
     password: str
@@ -15,25 +43,31 @@ class AuthInput(BaseModel):
 class RegisterInput(BaseModel):
     username: str
     email: EmailStr
-    password: str
+    password: str = Field(min_length=6, max_length=72)
+
+class UpdateProfileInput(BaseModel):
+    email: Optional[EmailStr] = None
+    password: Optional[str] = Field(default=None, min_length=6, max_length=72)
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     username: str
     email: str
     is_active: bool
     is_admin: bool
-    created_at: str
+    created_at: datetime
 
 
 @router.post('/login')
-def login(auth: AuthInput, db: Session = Depends(get_db)):
+async def login(auth: AuthInput, db: AsyncSession = Depends(get_db)):
     """
     Login with username and password
     Returns JWT token if credentials are valid
     """
     # Find user in database
-    user = db.query(User).filter(User.username == auth.username).first()
+    user = await db.scalar(select(User).where(User.username == auth.username))
     
     if not user:
         raise HTTPException(
@@ -41,8 +75,8 @@ def login(auth: AuthInput, db: Session = Depends(get_db)):
             detail="Invalid username or password"
         )
     
-    # Verify password
-    if not verify_password(auth.password, user.hashed_password):
+    # Verify password (Argon2 is CPU-bound, keep it off the event loop)
+    if not await run_in_threadpool(verify_password, auth.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
@@ -55,6 +89,11 @@ def login(auth: AuthInput, db: Session = Depends(get_db)):
             detail="User account is deactivated"
         )
     
+    # Upgrade legacy hashes now that we have the plain password
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await run_in_threadpool(hash_password, auth.password)
+        await db.commit()
+    
     # Create JWT token
     token = create_token({'sub': user.username, 'user_id': user.id})
     
@@ -71,35 +110,12 @@ def login(auth: AuthInput, db: Session = Depends(get_db)):
 
 
 @router.post('/register', status_code=status.HTTP_201_CREATED)
-def register(user_input: RegisterInput, db: Session = Depends(get_db)):
+async def register(user_input: RegisterInput, db: AsyncSession = Depends(get_db)):
     """
     Register a new user account
     """
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_input.username).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
-        )
-    
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_input.email).first()
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Validate password strength (optional)
-    if len(user_input.password) < 6:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Password must be at least 6 characters long"
-        )
-    
     # Create new user
-    hashed_pwd = hash_password(user_input.password)
+    hashed_pwd = await run_in_threadpool(hash_password, user_input.password)
     new_user = User(
         username=user_input.username,
         email=user_input.email,
@@ -107,9 +123,20 @@ def register(user_input: RegisterInput, db: Session = Depends(get_db)):
         is_active=True
     )
     
+    # Unique indexes on username/email reject duplicates, no pre-check queries
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        field = _duplicate_field(e)
+        if field is None:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{field.capitalize()} already registered"
+        )
+    await db.refresh(new_user)
     
     return {
         'message': 'User registered successfully',
@@ -122,43 +149,56 @@ def register(user_input: RegisterInput, db: Session = Depends(get_db)):
     }
 
 
+async def _load_user_row(db: AsyncSession, current_user: CurrentUser) -> User:
+    """
+    Full users row for the (possibly cached) CurrentUser
+    Raises 401 and drops the cache entry if the user was deleted meanwhile
+    """
+    user = await db.get(User, current_user.id)
+    if user is None:
+        invalidate_cached_user(current_user.username)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return user
+
+
 @router.get('/me', response_model=UserResponse)
-def get_current_user_info(
-    user: User = Depends(get_current_user)
+async def get_current_user_info(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get current logged-in user information
     Requires: Authorization header with Bearer token
     """
-    return {
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'is_active': user.is_active,
-        'is_admin': user.is_admin,
-        'created_at': user.created_at.isoformat()
-    }
+    # The dependency only carries auth columns; load the full profile
+    return await _load_user_row(db, current_user)
 
 
 @router.put('/me/update')
-def update_user_profile(
-    email: EmailStr = None,
-    password: str = None,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def update_user_profile(
+    body: UpdateProfileInput,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update current user's profile (email or password)
     Requires: Authorization header with Bearer token
     """
+    # The dependency only carries auth columns; load the full row to update it
+    user = await _load_user_row(db, current_user)
     updated_fields = []
+    email = body.email
+    password = body.password
     
     if email:
         # Check if email already taken by another user
-        existing = db.query(User).filter(
+        existing = await db.scalar(select(User).where(
             User.email == email,
             User.id != user.id
-        ).first()
+        ))
         
         if existing:
             raise HTTPException(
@@ -170,18 +210,13 @@ def update_user_profile(
         updated_fields.append('email')
     
     if password:
-        if len(password) < 6:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Password must be at least 6 characters long"
-            )
-        
-        user.hashed_password = hash_password(password)
+        user.hashed_password = await run_in_threadpool(hash_password, password)
         updated_fields.append('password')
     
     if updated_fields:
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        invalidate_cached_user(user.username)
     
     return {
         'message': 'Profile updated successfully',
@@ -195,11 +230,14 @@ def update_user_profile(
 
 
 @router.post('/logout')
-def logout(user: User = Depends(get_current_user)):
+async def logout(
+    user: CurrentUser = Depends(get_current_user)
+):
     """
     Logout endpoint (client should discard token)
     Requires: Authorization header with Bearer token
     """
+    invalidate_cached_user(user.username)
     return {
         'message': f'User {user.username} logged out successfully',
         'note': 'Please discard the JWT token on client side'
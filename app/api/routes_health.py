@@ -2,12 +2,41 @@
 Health check endpoints for monitoring and orchestration
 """
 from fastapi import APIRouter, status, Response
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
+from cachetools.func import ttl_cache
+import asyncio
+import time
 import psutil
 import os
 
 router = APIRouter(tags=["Health"])
 
+# Latest system metrics, refreshed in the background by sample_system_stats()
+SYSTEM_STATS_INTERVAL = 5  # seconds
+_system_stats = {
+    "cpu_percent": 0.0,
+    "memory_percent": 0.0,
+    "disk_percent": 0.0
+}
+
+# Static part of the /health body, only the timestamp changes per call
+HEALTH_RESPONSE = {
+    "status": "healthy",
+    "service": "FastAPI ML Application"
+}
+
+
+@lru_cache(maxsize=1)
+def _iso_timestamp(second: int) -> str:
+    """UTC ISO-8601 timestamp for a whole epoch second"""
+    return datetime.fromtimestamp(second, timezone.utc).isoformat(timespec='seconds')
+
+
+def utc_timestamp() -> str:
+    """Current UTC timestamp, formatted at most once per second"""
+    return _iso_timestamp(int(time.time()))
+
 
 @router.get("/health", status_code=status.HTTP_200_OK)
 async def health_check():
@@ -15,11 +44,7 @@ async def health_check():
     Basic health check endpoint
     Returns 200 if service is running
     """
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "service": "FastAPI ML Application"
-    }
+    return {**HEALTH_RESPONSE, "timestamp": utc_timestamp()}
 
 
 @router.get("/ready", status_code=status.HTTP_200_OK)
@@ -29,10 +54,16 @@ async def readiness_check(response: Response):
     Checks if service is ready to accept traffic
     Validates model, database, cache connections
     """
+    # Run the (blocking) checks side by side so a slow Redis ping doesn't delay the rest
+    model_ok, redis_ok, database_ok = await asyncio.gather(
+        asyncio.to_thread(check_model_loaded),
+        asyncio.to_thread(check_redis_connection),
+        asyncio.to_thread(check_database_connection),
+    )
     checks = {
-        "model": check_model_loaded(),
-        "redis": check_redis_connection(),
-        "database": check_database_connection(),
+        "model": model_ok,
+        "redis": redis_ok,
+        "database": database_ok,
     }
     
     all_ready = all(checks.values())
@@ -42,7 +73,7 @@ async def readiness_check(response: Response):
     
     return {
         "status": "ready" if all_ready else "not_ready",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_timestamp(),
         "checks": checks
     }
 
@@ -54,28 +85,40 @@ async def status_check():
     """
     return {
         "status": "operational",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_timestamp(),
         "uptime": get_uptime(),
-        "system": {
-            "cpu_percent": psutil.cpu_percent(interval=1),
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_percent": psutil.disk_usage('/').percent
-        },
+        "system": dict(_system_stats),
         "version": os.getenv("APP_VERSION", "1.0.0"),
         "environment": os.getenv("ENVIRONMENT", "development")
     }
 
 
+async def sample_system_stats(interval: float = SYSTEM_STATS_INTERVAL):
+    """
+    Background task: refresh system metrics every `interval` seconds
+    cpu_percent(interval=None) reports usage since the previous sample
+    """
+    while True:
+        _system_stats.update(
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=psutil.virtual_memory().percent,
+            disk_percent=psutil.disk_usage('/').percent
+        )
+        await asyncio.sleep(interval)
+
+
+# Probe results are cached briefly so frequent readiness probes stay cheap
+@ttl_cache(maxsize=1, ttl=3)
 def check_model_loaded() -> bool:
     """Check if ML model is loaded"""
     try:
-        from app.services.model_service import ModelService
-        service = ModelService()
-        return service.model is not None
+        from app.services.model_service import get_model
+        return get_model() is not None
     except Exception:
         return False
 
 
+@ttl_cache(maxsize=1, ttl=3)
 def check_redis_connection() -> bool:
     """Check Redis connection"""
     try:
@@ -86,6 +129,7 @@ def check_redis_connection() -> bool:
         return False
 
 
+@ttl_cache(maxsize=1, ttl=3)
 def check_database_connection() -> bool:
     """Check database connection"""
     try:
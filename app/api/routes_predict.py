@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from app.core.dependencies import get_api_key, get_current_user
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import select, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import get_api_key, get_current_user, CurrentUser
 from app.core.database import get_db
-from app.services.model_service import predict_car_price, batch_predict, get_model_info
-from app.database.models import Prediction, User
+from app.services.model_service import predict_car_price, batch_predict, get_model_info, MAX_BATCH
+from app.database.models import Prediction
 
 router = APIRouter()
 
@@ -23,45 +26,66 @@ class CarFeatures(BaseModel):
     seats: float
 
 class BatchPredictionRequest(BaseModel):
-    cars: list[CarFeatures]
+    # Oversized batches fail validation before any car is scored
+    cars: list[CarFeatures] = Field(max_length=MAX_BATCH)
+
+# Columns listed by /predictions/history; read as plain rows, no ORM objects
+HISTORY_COLUMNS = (
+    Prediction.id,
+    Prediction.company,
+    Prediction.year,
+    Prediction.transmission,
+    Prediction.km_driven,
+    Prediction.predicted_price,
+    Prediction.created_at,
+)
+HISTORY_FIELDS = tuple(column.key for column in HISTORY_COLUMNS)
+
+
+def prediction_row(car: CarFeatures, predicted_price: float, user_id: int) -> dict:
+    """
+    Column values for one predictions row
+    Shared by the single and batch endpoints so both insert the same shape
+    """
+    return {
+        'user_id': user_id,
+        'company': car.company,
+        'year': car.year,
+        'owner': car.owner,
+        'fuel': car.fuel,
+        'seller_type': car.seller_type,
+        'transmission': car.transmission,
+        'km_driven': int(car.km_driven),
+        'mileage_mpg': car.mileage_mpg,
+        'engine_cc': int(car.engine_cc),
+        'max_power_bhp': car.max_power_bhp,
+        'torque_nm': car.torque_nm,
+        'seats': int(car.seats),
+        'predicted_price': predicted_price,
+        'model_version': "1.0.0"
+    }
 
 
 @router.post('/predict')
-def predict_price(
+async def predict_price(
     car: CarFeatures, 
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     _: str = Depends(get_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Predict car price and save to database
     Requires: Authorization header with Bearer token and X-API-Key header
     """
-    # Make prediction
-    prediction = predict_car_price(car.model_dump())
+    # Make prediction (model + Redis are blocking, keep them off the event loop)
+    prediction = await run_in_threadpool(predict_car_price, car.model_dump())
     
     # Save prediction to database
-    db_prediction = Prediction(
-        user_id=user.id,
-        company=car.company,
-        year=car.year,
-        owner=car.owner,
-        fuel=car.fuel,
-        seller_type=car.seller_type,
-        transmission=car.transmission,
-        km_driven=int(car.km_driven),
-        mileage_mpg=car.mileage_mpg,
-        engine_cc=int(car.engine_cc),
-        max_power_bhp=car.max_power_bhp,
-        torque_nm=car.torque_nm,
-        seats=int(car.seats),
-        predicted_price=prediction,
-        model_version="1.0.0"
-    )
+    db_prediction = Prediction(**prediction_row(car, prediction, user.id))
     
     db.add(db_prediction)
-    db.commit()
-    db.refresh(db_prediction)
+    await db.commit()
+    await db.refresh(db_prediction)
     
     return {
         'predicted_price': f'{prediction:,.2f}',
@@ -72,44 +96,43 @@ def predict_price(
 
 
 @router.post('/predict/batch')
-def predict_batch(
+async def predict_batch(
     request: BatchPredictionRequest,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     _: str = Depends(get_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Predict prices for multiple cars
     Requires: Authorization header with Bearer token and X-API-Key header
     """
     car_data_list = [car.model_dump() for car in request.cars]
-    predictions = batch_predict(car_data_list)
+    predictions = await run_in_threadpool(batch_predict, car_data_list)
+    
+    # Save all successful predictions in a single INSERT + commit
+    rows = [
+        prediction_row(car, prediction, user.id)
+        for car, prediction in zip(request.cars, predictions)
+        if prediction is not None
+    ]
     
-    # Save all predictions
     saved_ids = []
-    for car, prediction in zip(request.cars, predictions):
-        if prediction is not None:
-            db_prediction = Prediction(
-                user_id=user.id,
-                company=car.company,
-                year=car.year,
-                owner=car.owner,
-                fuel=car.fuel,
-                seller_type=car.seller_type,
-                transmission=car.transmission,
-                km_driven=int(car.km_driven),
-                mileage_mpg=car.mileage_mpg,
-                engine_cc=int(car.engine_cc),
-                max_power_bhp=car.max_power_bhp,
-                torque_nm=car.torque_nm,
-                seats=int(car.seats),
-                predicted_price=prediction,
-                model_version="1.0.0"
+    if rows:
+        # One executemany INSERT ... RETURNING (asyncpg / SQLite >= 3.35); a COPY
+        # would be a single statement too but can't hand back the new ids
+        if db.bind.dialect.insert_executemany_returning:
+            result = await db.execute(
+                insert(Prediction).returning(Prediction.id, sort_by_parameter_order=True),
+                rows
             )
-            db.add(db_prediction)
-            db.commit()
-            db.refresh(db_prediction)
-            saved_ids.append(db_prediction.id)
+            saved_ids = list(result.scalars().all())
+        else:
+            # No executemany RETURNING (old SQLite): flush the batch in one transaction
+            db_predictions = [Prediction(**row) for row in rows]
+            db.add_all(db_predictions)
+            await db.flush()
+            saved_ids = [p.id for p in db_predictions]
+        await db.commit()
     
     return {
         'total': len(predictions),
@@ -120,10 +143,10 @@ def predict_batch(
 
 
 @router.get('/predictions/history')
-def get_prediction_history(
-    user: User = Depends(get_current_user),
+async def get_prediction_history(
+    user: CurrentUser = Depends(get_current_user),
     _: str = Depends(get_api_key),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     limit: int = 10,
     skip: int = 0
 ):
@@ -131,49 +154,48 @@ def get_prediction_history(
     Get user's prediction history with pagination
     Requires: Authorization header with Bearer token and X-API-Key header
     """
-    predictions = db.query(Prediction)\
-        .filter(Prediction.user_id == user.id)\
-        .order_by(Prediction.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    # Page and total count in one round trip via a window function
+    result = await db.execute(
+        select(*HISTORY_COLUMNS, func.count().over().label('total'))
+        .where(Prediction.user_id == user.id)
+        .order_by(Prediction.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = result.mappings().all()
     
-    total = db.query(Prediction).filter(Prediction.user_id == user.id).count()
+    if rows:
+        total = rows[0]['total']
+    elif skip:
+        # Paged past the end, the window has nothing to report
+        total = await db.scalar(
+            select(func.count(Prediction.id)).where(Prediction.user_id == user.id)
+        )
+    else:
+        total = 0
     
-    return {
+    # Returning the response directly skips jsonable_encoder; orjson handles datetimes
+    return ORJSONResponse({
         'user': user.username,
         'total': total,
         'limit': limit,
         'skip': skip,
-        'predictions': [
-            {
-                'id': p.id,
-                'company': p.company,
-                'year': p.year,
-                'transmission': p.transmission,
-                'km_driven': p.km_driven,
-                'predicted_price': f'{p.predicted_price:,.2f}',
-                'created_at': p.created_at.isoformat()
-            }
-            for p in predictions
-        ]
-    }
+        'predictions': [{field: row[field] for field in HISTORY_FIELDS} for row in rows]
+    })
 
 
 @router.get('/predictions/{prediction_id}')
-def get_prediction_detail(
+async def get_prediction_detail(
     prediction_id: int,
-    user: User = Depends(get_current_user),
+    user: CurrentUser = Depends(get_current_user),
     _: str = Depends(get_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get detailed information about a specific prediction
     Requires: Authorization header with Bearer token and X-API-Key header
     """
-    prediction = db.query(Prediction)\
-        .filter(Prediction.id == prediction_id)\
-        .first()
+    prediction = await db.get(Prediction, prediction_id)
     
     if not prediction:
         return {'error': 'Prediction not found'}
@@ -206,23 +228,24 @@ def get_prediction_detail(
 
 
 @router.get('/predictions/stats/summary')
-def get_predictions_stats(
-    user: User = Depends(get_current_user),
+async def get_predictions_stats(
+    user: CurrentUser = Depends(get_current_user),
     _: str = Depends(get_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get summary statistics of user's predictions
     Requires: Authorization header with Bearer token and X-API-Key header
     """
-    from sqlalchemy import func
-    
-    stats = db.query(
-        func.count(Prediction.id).label('total_predictions'),
-        func.avg(Prediction.predicted_price).label('avg_price'),
-        func.min(Prediction.predicted_price).label('min_price'),
-        func.max(Prediction.predicted_price).label('max_price')
-    ).filter(Prediction.user_id == user.id).first()
+    result = await db.execute(
+        select(
+            func.count().label('total_predictions'),
+            func.avg(Prediction.predicted_price).label('avg_price'),
+            func.min(Prediction.predicted_price).label('min_price'),
+            func.max(Prediction.predicted_price).label('max_price')
+        ).where(Prediction.user_id == user.id)
+    )
+    stats = result.first()
     
     return {
         'user': user.username,
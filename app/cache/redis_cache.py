@@ -1,5 +1,5 @@
 # For local deployement
-import json
+import orjson
 import redis
 from app.core.config import settings
 
@@ -8,11 +8,26 @@ redis_client = redis.Redis.from_url(settings.REDIS_URL)
 def get_cached_prediction(key: str):
     value = redis_client.get(key)
     if value:
-        return json.loads(value)
+        return orjson.loads(value)
     return None
 
 def set_cached_prediction(key: str, value: dict,  expiry: int = 3600):
-    redis_client.setex(key, expiry, json.dumps(value))
+    redis_client.setex(key, expiry, orjson.dumps(value))
+
+def get_cached_predictions_bulk(keys: list) -> list:
+    # One MGET round trip; None for keys that aren't cached
+    if not keys:
+        return []
+    return [orjson.loads(value) if value else None for value in redis_client.mget(keys)]
+
+def set_cached_predictions_bulk(mapping: dict, expiry: int = 3600):
+    # SETEX per key, sent together in one pipeline round trip
+    if not mapping:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    for key, value in mapping.items():
+        pipe.setex(key, expiry, orjson.dumps(value))
+    pipe.execute()
 
 
 # For server deployement
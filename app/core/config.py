@@ -1,4 +1,5 @@
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -8,8 +9,9 @@ load_dotenv()
 # Get base directory
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+@dataclass(frozen=True, repr=False)
 class Settings:
-    """Application settings and configuration"""
+    """Application settings and configuration (read once at import)"""
     
     # Application
     PROJECT_NAME: str = "Car Price Prediction API"
@@ -22,12 +24,29 @@ class Settings:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "change-this-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Seconds an authenticated user's id/flags are reused without a DB lookup;
+    # also how long a deactivation or role change can take to apply
+    USER_CACHE_TTL: int = int(os.getenv("USER_CACHE_TTL", "10"))
+    
+    # Argon2id cost (OWASP server-side profile); raising these upgrades hashes on next login
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "2"))
+    ARGON2_MEMORY_KIB: int = int(os.getenv("ARGON2_MEMORY_KIB", "19456"))  # 19 MiB
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "1"))
     
     # Database
     DATABASE_URL: str = os.getenv(
         "DATABASE_URL",
         f"sqlite:///{BASE_DIR}/app.db"
     )
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    # Keep (workers x (pool size + overflow)) below Postgres max_connections
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # seconds
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "5"))  # connections opened at startup
+    
+    # Worker threads for run_in_threadpool / sync endpoints (model inference, hashing)
+    THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", "200"))
     
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
@@ -39,12 +58,26 @@ class Settings:
     # Model
     MODEL_PATH: str = os.getenv("MODEL_PATH", "app/models/model.joblib")
     MODEL_VERSION: str = os.getenv("MODEL_VERSION", "1.0.0")
+    # Native forest built by training/train_model.py when treelite is installed
+    COMPILED_MODEL_PATH: str = os.getenv("COMPILED_MODEL_PATH", "app/models/rf.so")
+    # Forest as one memory-mapped node array plus the fitted preprocessor on its own;
+    # when both exist the pipeline pickle isn't loaded and workers share the arrays via the page cache
+    FOREST_PATH: str = os.getenv("FOREST_PATH", "app/models/forest.npy")
+    PREPROCESSOR_PATH: str = os.getenv("PREPROCESSOR_PATH", "app/models/preprocessor.joblib")
+    # Per (company, year, fuel) price stats; tight, well-populated buckets skip the model
+    BUCKETS_PATH: str = os.getenv("BUCKETS_PATH", "app/models/buckets.pkl")
+    BUCKET_MAX_CV: float = float(os.getenv("BUCKET_MAX_CV", "0.08"))  # std / mean
+    BUCKET_MIN_COUNT: int = int(os.getenv("BUCKET_MIN_COUNT", "20"))
     
     # CORS
-    ALLOWED_ORIGINS: list = os.getenv(
-        "ALLOWED_ORIGINS",
-        "http://localhost:3000,http://localhost:8000"
-    ).split(",")
+    ALLOWED_ORIGINS: tuple = tuple(
+        origin.strip()
+        for origin in os.getenv(
+            "ALLOWED_ORIGINS",
+            "http://localhost:3000,http://localhost:8000"
+        ).split(",")
+        if origin.strip()
+    )
     
     # Monitoring
     ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "True").lower() == "true"
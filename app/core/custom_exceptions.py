@@ -1,11 +1,19 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, HTTPException, Response
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+JSON_MEDIA_TYPE = "application/json"
+
+# Error bodies that never change, serialized once
+DATABASE_ERROR_BODY = orjson.dumps({
+    "error": "Database operation failed",
+    "message": "An error occurred while processing your request"
+})
+
 # Custom Exception Classes
 class CustomAPIException(Exception):
     """Base exception for custom API errors"""
@@ -30,6 +38,15 @@ class DatabaseException(CustomAPIException):
     def __init__(self, message: str = "Database operation failed"):
         super().__init__(message, status_code=500)
 
+def json_error(content: dict, status_code: int) -> Response:
+    """Serialize an error body with orjson straight into a plain Response"""
+    return Response(
+        content=orjson.dumps(content),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE
+    )
+
+
 def register_exception_handler(app: FastAPI):
     """
     Register global exception handlers for the FastAPI application
@@ -38,84 +55,83 @@ def register_exception_handler(app: FastAPI):
     @app.exception_handler(CustomAPIException)
     async def custom_api_exception_handler(request: Request, exc: CustomAPIException):
         """Handle custom API exceptions"""
-        logger.error(f"Custom API Error: {exc.message} - Path: {request.url.path}")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
+        logger.error("Custom API Error: %s - Path: %s", exc.message, request.url.path)
+        return json_error(
+            {
                 "error": exc.message,
-                "path": str(request.url.path)
-            }
+                "path": request.url.path
+            },
+            exc.status_code
         )
     
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
         """Handle FastAPI HTTP exceptions"""
-        logger.warning(f"HTTP {exc.status_code}: {exc.detail} - Path: {request.url.path}")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
+        logger.warning("HTTP %s: %s - Path: %s", exc.status_code, exc.detail, request.url.path)
+        return json_error(
+            {
                 "error": exc.detail,
                 "status_code": exc.status_code
-            }
+            },
+            exc.status_code
         )
     
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         """Handle request validation errors (Pydantic)"""
-        errors = []
-        for error in exc.errors():
-            errors.append({
+        errors = [
+            {
                 "field": " -> ".join(str(loc) for loc in error["loc"]),
                 "message": error["msg"],
                 "type": error["type"]
-            })
+            }
+            for error in exc.errors()
+        ]
         
-        logger.warning(f"Validation Error - Path: {request.url.path} - Errors: {errors}")
-        return JSONResponse(
-            status_code=422,
-            content={
+        logger.warning("Validation Error - Path: %s - Errors: %s", request.url.path, errors)
+        return json_error(
+            {
                 "error": "Validation failed",
                 "details": errors
-            }
+            },
+            422
         )
     
     @app.exception_handler(SQLAlchemyError)
     async def database_exception_handler(request: Request, exc: SQLAlchemyError):
         """Handle database errors"""
-        logger.error(f"Database Error: {str(exc)} - Path: {request.url.path}")
+        logger.error("Database Error: %s - Path: %s", exc, request.url.path)
         
         # Don't expose internal database errors in production
-        return JSONResponse(
+        return Response(
+            content=DATABASE_ERROR_BODY,
             status_code=500,
-            content={
-                "error": "Database operation failed",
-                "message": "An error occurred while processing your request"
-            }
+            media_type=JSON_MEDIA_TYPE
         )
     
     @app.exception_handler(ValueError)
     async def value_error_handler(request: Request, exc: ValueError):
         """Handle value errors"""
-        logger.warning(f"ValueError: {str(exc)} - Path: {request.url.path}")
-        return JSONResponse(
-            status_code=400,
-            content={
+        logger.warning("ValueError: %s - Path: %s", exc, request.url.path)
+        return json_error(
+            {
                 "error": "Invalid value",
                 "message": str(exc)
-            }
+            },
+            400
         )
     
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
         """Handle all unhandled exceptions"""
-        logger.error(f"Unhandled Exception: {type(exc).__name__}: {str(exc)} - Path: {request.url.path}", exc_info=True)
+        # Traceback goes to the logs only; the client gets a short code + request id
+        logger.exception("Unhandled exception - Path: %s", request.url.path, exc_info=exc)
         
-        # Don't expose internal errors in production
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": "Internal server error",
-                "message": "An unexpected error occurred. Please try again later.",
-                "type": type(exc).__name__
-            }
+        request_id = getattr(request.state, "request_id", None) or request.headers.get("x-request-id", "")
+        return json_error(
+            {
+                "detail": "internal_error",
+                "request_id": request_id
+            },
+            500
         )
\ No newline at end of file
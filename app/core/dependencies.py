@@ -1,13 +1,38 @@
+import re
 from fastapi import Header, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from dataclasses import dataclass
+from cachetools import TTLCache
 from app.core.config import settings
-from app.core.security import verify_token
+from app.core.security import verify_token, safe_eq
 from app.core.database import get_db
 from app.database.models import User
 
 
-def get_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """The columns request handlers need to authorize the caller"""
+    id: int
+    username: str
+    is_active: bool
+    is_admin: bool
+
+
+# "Bearer <token>", scheme case-insensitive
+_BEARER = re.compile(r"bearer\s+(\S+)\s*", re.IGNORECASE)
+
+# Authenticated users keyed by username (the verified JWT `sub`),
+# so repeat calls skip the DB lookup for a short while.
+# Only active users are cached. No route changes is_active/is_admin, so an
+# account deactivated or demoted directly in the DB keeps its cached rights
+# for up to USER_CACHE_TTL seconds; call invalidate_cached_user() from any
+# code that changes them.
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=settings.USER_CACHE_TTL)
+
+
+async def get_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     """
     Validate the API key provided in the request header.
     
@@ -25,7 +50,7 @@ def get_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
             detail="API key is required. Provide X-API-Key header."
         )
     
-    if x_api_key.strip() != settings.API_KEY:
+    if not safe_eq(x_api_key.strip(), settings.API_KEY):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API key"
@@ -34,7 +59,7 @@ def get_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
-def get_token_from_header(authorization: str = Header(None, alias="Authorization")):
+async def get_token_from_header(authorization: str = Header(None, alias="Authorization")):
     """
     Extract JWT token from Authorization header
     
@@ -56,20 +81,20 @@ def get_token_from_header(authorization: str = Header(None, alias="Authorization
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Check if it starts with "Bearer "
-    parts = authorization.split()
+    # Check it is exactly "Bearer <token>"
+    match = _BEARER.fullmatch(authorization)
     
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    if match is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authorization header. Use: Bearer <token>",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    return parts[1]
+    return match.group(1)
 
 
-def get_current_user_payload(token: str = Depends(get_token_from_header)):
+async def get_current_user_payload(token: str = Depends(get_token_from_header)):
     """
     Validate the JWT token and return the decoded payload.
     
@@ -94,19 +119,20 @@ def get_current_user_payload(token: str = Depends(get_token_from_header)):
     return payload
 
 
-def get_current_user(
+async def get_current_user(
     payload: dict = Depends(get_current_user_payload),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
     """
     Get the current authenticated user from database
+    Cached per username for a short TTL once the JWT has been verified
     
     Args:
         payload: Decoded JWT token payload
         db: Database session
         
     Returns:
-        User: The authenticated user object
+        CurrentUser: id, username and flags of the authenticated user
         
     Raises:
         HTTPException: If user not found or inactive
@@ -119,8 +145,16 @@ def get_current_user(
             detail="Invalid token payload"
         )
     
+    cached = _user_cache.get(username)
+    if cached is not None:
+        return cached
+    
     # Get user from database
-    user = db.query(User).filter(User.username == username).first()
+    # Only the auth columns, so the covering index answers without loading the row
+    user = (await db.execute(
+        select(User.id, User.username, User.is_active, User.is_admin)
+        .where(User.username == username)
+    )).first()
     
     if not user:
         raise HTTPException(
@@ -134,10 +168,27 @@ def get_current_user(
             detail="User account is deactivated"
         )
     
-    return user
+    current_user = CurrentUser(
+        id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        is_admin=user.is_admin
+    )
+    _user_cache[username] = current_user
+    return current_user
+
+
+def invalidate_cached_user(username: str) -> None:
+    """
+    Drop the cached user (logout, profile changes, deactivation)
+    
+    Args:
+        username: Username the user was cached under
+    """
+    _user_cache.pop(username, None)
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """
     Ensure the current user is active
     
@@ -145,7 +196,7 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
         current_user: Current authenticated user
         
     Returns:
-        User: Active user object
+        CurrentUser: Active user
         
     Raises:
         HTTPException: If user is not active
@@ -158,7 +209,7 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """
     Ensure the current user is an admin
     
@@ -166,7 +217,7 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
         current_user: Current authenticated user
         
     Returns:
-        User: Admin user object
+        CurrentUser: Admin user
         
     Raises:
         HTTPException: If user is not an admin
@@ -179,7 +230,7 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
     return current_user
 
 
-def optional_authentication(
+async def optional_authentication(
     authorization: str = Header(None, alias="Authorization")
 ) -> Optional[dict]:
     """
@@ -196,7 +247,7 @@ def optional_authentication(
         return None
     
     try:
-        token = get_token_from_header(authorization)
+        token = await get_token_from_header(authorization)
         return verify_token(token)
     except:
         return None
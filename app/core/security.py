@@ -1,14 +1,53 @@
-from datetime import datetime, timezone, timedelta
-from jose import jwt, JWTError, ExpiredSignatureError
+import hashlib
+import hmac
+import threading
+import time
+from cachetools import TTLCache
+import jwt
+from jwt import InvalidTokenError
 from app.core.config import settings
 #from passlib.context import CryptContext
 from typing import Dict, Optional
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from argon2.exceptions import InvalidHashError, VerificationError
 
 
-# Argon2 password hasher
-ph = PasswordHasher()
+# JWT key and algorithm resolved once at import
+_SECRET = settings.JWT_SECRET_KEY.encode()
+_ALG = settings.JWT_ALGORITHM
+_ALGORITHMS = [_ALG]
+
+# Decoded-token cache keyed by a truncated sha256 of the token.
+# Invalid tokens are remembered briefly too, so floods of bad tokens stay cheap.
+TOKEN_CACHE_TTL = 30
+INVALID_TOKEN_CACHE_TTL = 5
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+_invalid_token_cache = TTLCache(maxsize=10_000, ttl=INVALID_TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+# Argon2id password hasher, cost tuned through settings
+ph = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_KIB,
+    parallelism=settings.ARGON2_PARALLELISM,
+    hash_len=32,
+    salt_len=16
+)
+
+# Recent verification results for a few seconds, keyed by HMAC(secret, password|hash).
+# The raw password is never kept; a changed hash simply misses.
+VERIFY_CACHE_SIZE = 2048
+VERIFY_CACHE_TTL = 10
+_verify_cache = TTLCache(maxsize=VERIFY_CACHE_SIZE, ttl=VERIFY_CACHE_TTL)
+_verify_cache_lock = threading.Lock()
+
+def safe_eq(a: str, b: str) -> bool:
+    """
+    Compare two secrets in constant time so the comparison
+    doesn't leak how many leading characters matched.
+    """
+    return hmac.compare_digest(a.encode(), b.encode())
+
 
 def create_token(data: dict, expire_minutes: int=30) -> str:
     """
@@ -17,14 +56,8 @@ def create_token(data: dict, expire_minutes: int=30) -> str:
     """
     if expire_minutes <= 0:
         raise ValueError("expire_minutes must be a positive integer")
-    to_encode = data.copy()
-    expire_at = datetime.now(timezone.utc) + timedelta(minutes=expire_minutes)
-    to_encode["exp"] = int(expire_at.timestamp())
-    return jwt.encode(
-        to_encode,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM
-    )
+    to_encode = {**data, "exp": int(time.time()) + expire_minutes * 60}
+    return jwt.encode(to_encode, _SECRET, algorithm=_ALG)
 
 
 def verify_token(token: str) -> Optional[Dict[str, any]]:
@@ -33,19 +66,31 @@ def verify_token(token: str) -> Optional[Dict[str, any]]:
 
     The token signature, algorithm are validated.
     Returns None if the token is invalid or expired.
+    Results are cached for a few seconds, see TOKEN_CACHE_TTL.
     """
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    
+    with _token_cache_lock:
+        payload = _token_cache.get(key)
+        if payload is not None:
+            return payload
+        if key in _invalid_token_cache:
+            return None
+    
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        return payload
-    except ExpiredSignatureError:
-        return None
-    except JWTError:
+        payload = jwt.decode(token, _SECRET, algorithms=_ALGORITHMS)
+    except InvalidTokenError:
+        with _token_cache_lock:
+            _invalid_token_cache[key] = True
         return None
     
+    # Only cache tokens that outlive the cache entry, so expiry is never missed
+    exp = payload.get("exp")
+    if exp is None or exp - time.time() > TOKEN_CACHE_TTL:
+        with _token_cache_lock:
+            _token_cache[key] = payload
+    return payload
+    
 
 def hash_password(password: str) -> str:
     """
@@ -63,6 +108,7 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against its Argon2 hash
+    Repeated checks of the same credentials are answered from a short-lived cache
     
     Args:
         plain_password: Plain text password to verify
@@ -71,8 +117,45 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
+    cache_key = hmac.new(
+        settings.JWT_SECRET_KEY.encode(),
+        plain_password.encode() + b"|" + hashed_password.encode(),
+        hashlib.sha256
+    ).digest()
+    
+    with _verify_cache_lock:
+        cached = _verify_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    result = _verify_uncached(plain_password, hashed_password)
+    
+    with _verify_cache_lock:
+        _verify_cache[cache_key] = result
+    
+    return result
+
+
+def _verify_uncached(plain_password: str, hashed_password: str) -> bool:
+    """
+    Run the actual Argon2 check
+    A malformed stored hash counts as a failed login, not a server error
+    """
     try:
         ph.verify(hashed_password, plain_password)
         return True
-    except VerifyMismatchError:
-        return False
\ No newline at end of file
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check if a stored hash should be replaced with a fresh Argon2id hash
+    
+    Args:
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True for Argon2 hashes made with different cost parameters, False otherwise
+    """
+    return ph.check_needs_rehash(hashed_password)
\ No newline at end of file
@@ -1,9 +1,11 @@
 """
 Database models (tables) for SQLAlchemy
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import Integer, String, Float, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
 
@@ -11,17 +13,22 @@ class User(Base):
     """User table"""
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, index=True, nullable=False)
-    email = Column(String(100), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
-    is_active = Column(Boolean, default=True)
-    is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
+    email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
+    hashed_password: Mapped[str] = mapped_column(String(255))
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    is_admin: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationship
-    predictions = relationship("Prediction", back_populates="user")
+    predictions: Mapped[List["Prediction"]] = relationship(back_populates="user")
+    
+    __table_args__ = (
+        # Auth lookup (id + flags by username) served from the index alone on Postgres
+        Index("ix_users_username_active_admin", username, is_active, is_admin, postgresql_include=["id"]),
+    )
     
     def __repr__(self):
         return f"<User(username='{self.username}')>"
@@ -31,30 +38,37 @@ class Prediction(Base):
     """Prediction history table"""
     __tablename__ = "predictions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"))
     
     # Car details
-    company = Column(String(50))
-    year = Column(Integer)
-    owner = Column(String(20))
-    fuel = Column(String(20))
-    seller_type = Column(String(20))
-    transmission = Column(String(20))
-    km_driven = Column(Integer)
-    mileage_mpg = Column(Float)
-    engine_cc = Column(Integer)
-    max_power_bhp = Column(Float)
-    torque_nm = Column(Float)
-    seats = Column(Integer)
+    company: Mapped[Optional[str]] = mapped_column(String(50))
+    year: Mapped[Optional[int]] = mapped_column(Integer)
+    owner: Mapped[Optional[str]] = mapped_column(String(20))
+    fuel: Mapped[Optional[str]] = mapped_column(String(20))
+    seller_type: Mapped[Optional[str]] = mapped_column(String(20))
+    transmission: Mapped[Optional[str]] = mapped_column(String(20))
+    km_driven: Mapped[Optional[int]] = mapped_column(Integer)
+    mileage_mpg: Mapped[Optional[float]] = mapped_column(Float)
+    engine_cc: Mapped[Optional[int]] = mapped_column(Integer)
+    max_power_bhp: Mapped[Optional[float]] = mapped_column(Float)
+    torque_nm: Mapped[Optional[float]] = mapped_column(Float)
+    seats: Mapped[Optional[int]] = mapped_column(Integer)
     
     # Prediction result
-    predicted_price = Column(Float, nullable=False)
-    model_version = Column(String(20))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    predicted_price: Mapped[float] = mapped_column(Float)
+    model_version: Mapped[Optional[str]] = mapped_column(String(20))
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
-    user = relationship("User", back_populates="predictions")
+    user: Mapped[Optional["User"]] = relationship(back_populates="predictions")
+    
+    __table_args__ = (
+        # History: WHERE user_id = ? ORDER BY created_at DESC LIMIT n -> one index range scan
+        Index("ix_pred_user_created", user_id, created_at.desc()),
+        # Stats: count/avg/min/max(predicted_price) per user straight from the index
+        Index("ix_pred_user_price", user_id, predicted_price),
+    )
     
     def __repr__(self):
-        return f"<Prediction(id={self.id}, company='{self.company}', price={self.predicted_price})>"
\ No newline at end of file
+        return f"<Prediction(id={self.id}, company='{self.company}', price={self.predicted_price})>"
@@ -1,26 +1,71 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 from app.api import routes_auth, routes_predict, routes_health
 from app.middleware.logging_middleware import LoggingMiddleware
-from app.core.custom_exceptions import register_exception_handler
-from app.core.database import init_db
+from app.core.custom_exceptions import register_exception_handler, ModelNotLoadedException
+from app.core.config import settings
+from app.core.database import init_db, warm_db_pool
+from app.services.model_service import load_model
+from logging.handlers import QueueHandler, QueueListener
+import anyio.to_thread
+import asyncio
+import atexit
 import logging
+import queue
 
 # Configure logging format
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
+# Handlers only enqueue records; a listener thread does the stream I/O off the event loop
+log_queue = queue.SimpleQueue()
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(logging.Formatter(
+    '%(asctime)s | %(levelname)s | %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
-)
+))
+log_listener = QueueListener(log_queue, log_stream_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+log_queue_handler = QueueHandler(log_queue)
+log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[log_queue_handler])
 
-app = FastAPI(title="Car Price Prediction API")
 
-# Initialize database on startup
-@app.on_event("startup")
-def startup_event():
-    """Create database tables on application startup"""
-    init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown hooks"""
+    # Raise anyio's default 40-thread cap used by run_in_threadpool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    
+    # Initialize database on startup
+    await init_db()
     print("✅ Database initialized - tables created")
+    
+    # Warm the connection pool and the ML model before taking traffic
+    await warm_db_pool(settings.DB_POOL_MIN_SIZE)
+    try:
+        await asyncio.to_thread(load_model)
+    except ModelNotLoadedException as e:
+        # Keep serving; /ready reports the model as not loaded
+        logging.getLogger(__name__).warning(f"Model not loaded on startup: {e.message}")
+    
+    # Sample system metrics in the background for /status
+    stats_task = asyncio.create_task(routes_health.sample_system_stats())
+    
+    # Build the OpenAPI schema now (cached on app.openapi_schema) so the first /docs hit is cheap
+    app.openapi()
+    
+    yield
+    
+    stats_task.cancel()
+
+
+app = FastAPI(
+    title="Car Price Prediction API",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
 #Link Middleware
 app.add_middleware(LoggingMiddleware)
@@ -28,7 +73,7 @@ app.add_middleware(LoggingMiddleware)
 # Link Endpoints
 app.include_router(routes_auth.router, tags=['Auth'])
 app.include_router(routes_predict.router, tags=['Prediction'])
-app.include_router(routes_health.router, tags=['Health'])
+app.include_router(routes_health.router)  # router already carries the Health tag
 
 # Monitoring using Prometheus
 Instrumentator().instrument(app).expose(app)
@@ -1,6 +1,9 @@
 import logging
 import time
 import json
+import itertools
+import os
+import re
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
@@ -8,6 +11,11 @@ from typing import Callable
 
 logger = logging.getLogger(__name__)
 
+# Request IDs: a random 32-bit per-process prefix plus a 32-bit counter, 16 hex chars;
+# the counter only wraps after ~4.3 billion requests in one process
+_request_id_prefix = os.urandom(4).hex()
+_request_counter = itertools.count()
+
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     """
@@ -15,94 +23,104 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     with timing, headers, and error information
     """
     
-    def __init__(self, app, log_body: bool = False):
+    def __init__(
+        self,
+        app,
+        log_body: bool = False,
+        skip_paths: frozenset = frozenset({"/metrics", "/health", "/ready"})
+    ):
         """
         Args:
             app: FastAPI application
-            log_body: Whether to log request/response bodies (be careful with sensitive data)
+            log_body: Whether to log request body size and content type
+            skip_paths: Paths passed straight through without logging or timing headers
         """
         super().__init__(app)
         self.log_body = log_body
+        self.skip_paths = frozenset(skip_paths)
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """
         Process each request and log details
         """
-        # Start timer
-        start_time = time.time()
+        # Monitoring endpoints bypass the middleware; scope["path"] skips URL parsing
+        if request.scope["path"] in self.skip_paths:
+            return await call_next(request)
+        
+        # Start timer (monotonic, integer nanoseconds)
+        start_ns = time.perf_counter_ns()
         
         # Generate request ID for tracking
         request_id = self._generate_request_id(request)
+        request.state.request_id = request_id
         
-        # Log incoming request
-        await self._log_request(request, request_id)
+        # Log incoming request (no I/O, so no await)
+        self._log_request(request, request_id)
         
         try:
             # Process request
             response = await call_next(request)
             
-            # Calculate processing time
-            process_time = time.time() - start_time
+            # Calculate processing time in microseconds
+            elapsed_us = (time.perf_counter_ns() - start_ns) // 1000
             
             # Add custom headers
             response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = f"{process_time:.4f}s"
+            response.headers["X-Process-Time"] = f"{elapsed_us}us"
             
             # Log response
-            self._log_response(request, response, process_time, request_id)
+            self._log_response(request, response, elapsed_us, request_id)
             
             return response
             
         except Exception as e:
             # Calculate processing time even for errors
-            process_time = time.time() - start_time
+            elapsed_us = (time.perf_counter_ns() - start_ns) // 1000
             
             # Log error
             logger.error(
-                f"[{request_id}] ERROR | "
-                f"{request.method} {request.url.path} | "
-                f"Time: {process_time:.4f}s | "
-                f"Error: {type(e).__name__}: {str(e)}",
+                "[%s] ERROR | %s %s | Time: %dus | Error: %s: %s",
+                request_id, request.method, request.url.path,
+                elapsed_us, type(e).__name__, e,
                 exc_info=True
             )
             
             # Re-raise to be handled by exception handlers
             raise
     
-    async def _log_request(self, request: Request, request_id: str):
+    def _log_request(self, request: Request, request_id: str):
         """Log incoming request details"""
+        # Skip building the message when INFO is filtered out
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         # Get client info
         client_host = request.client.host if request.client else "unknown"
         
-        # Build log message
-        log_msg = (
-            f"[{request_id}] REQUEST | "
-            f"{request.method} {request.url.path} | "
-            f"Client: {client_host}"
-        )
+        # Build log format and args; logging interpolates them only when emitting
+        log_fmt = "[%s] REQUEST | %s %s | Client: %s"
+        log_args = [request_id, request.method, request.url.path, client_host]
         
         # Add query parameters if present
-        if request.url.query:
-            log_msg += f" | Query: {request.url.query}"
+        query = request.url.query
+        if query:
+            log_fmt += " | Query: %s"
+            log_args.append(query)
         
         # Add user agent if present
-        user_agent = request.headers.get("user-agent", "unknown")
-        log_msg += f" | User-Agent: {user_agent[:50]}"
+        log_fmt += " | User-Agent: %.50s"
+        log_args.append(request.headers.get("user-agent", "unknown"))
         
-        # Log request body for debugging (be careful with sensitive data)
+        # Describe the body from its headers; reading it here would buffer
+        # every upload in memory before the handler streams it again
         if self.log_body and request.method in ["POST", "PUT", "PATCH"]:
-            try:
-                body = await request.body()
-                if body:
-                    # Limit body size in logs
-                    body_str = body.decode()[:500]
-                    log_msg += f" | Body: {body_str}"
-            except:
-                pass
-        
-        logger.info(log_msg)
+            log_fmt += " | Body: %s bytes (%s)"
+            log_args.append(request.headers.get("content-length", "unknown"))
+            log_args.append(request.headers.get("content-type", "unknown"))
+        
+        logger.info(log_fmt, *log_args)
     
-    def _log_response(self, request: Request, response: Response, process_time: float, request_id: str):
+    def _log_response(self, request: Request, response: Response, elapsed_us: int, request_id: str):
         """Log outgoing response details"""
         # Determine log level based on status code
         status_code = response.status_code
@@ -117,20 +135,20 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             log_level = logging.ERROR
             status_emoji = "❌"
         
-        # Build log message
-        log_msg = (
-            f"[{request_id}] RESPONSE {status_emoji} | "
-            f"{request.method} {request.url.path} | "
-            f"Status: {status_code} | "
-            f"Time: {process_time:.4f}s"
-        )
+        if not logger.isEnabledFor(log_level):
+            return
+        
+        # Build log format and args
+        log_fmt = "[%s] RESPONSE %s | %s %s | Status: %s | Time: %dus"
+        log_args = [request_id, status_emoji, request.method, request.url.path, status_code, elapsed_us]
         
         # Add response size if available
         content_length = response.headers.get("content-length")
         if content_length:
-            log_msg += f" | Size: {content_length} bytes"
+            log_fmt += " | Size: %s bytes"
+            log_args.append(content_length)
         
-        logger.log(log_level, log_msg)
+        logger.log(log_level, log_fmt, *log_args)
     
     def _generate_request_id(self, request: Request) -> str:
         """
@@ -139,9 +157,7 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         """
         request_id = request.headers.get("X-Request-ID")
         if not request_id:
-            # Generate simple ID based on timestamp
-            import uuid
-            request_id = str(uuid.uuid4())[:8]
+            request_id = _request_id_prefix + format(next(_request_counter) & 0xFFFFFFFF, "08x")
         return request_id
 
 
@@ -152,12 +168,12 @@ class RequestTimingMiddleware(BaseHTTPMiddleware):
     """
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         response = await call_next(request)
         
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = f"{process_time:.4f}s"
+        elapsed_us = (time.perf_counter_ns() - start_ns) // 1000
+        response.headers["X-Process-Time"] = f"{elapsed_us}us"
         
         return response
 
@@ -171,14 +187,14 @@ class HealthCheckFilter(logging.Filter):
     def __init__(self, paths_to_exclude: list = None):
         super().__init__()
         self.paths_to_exclude = paths_to_exclude or ["/health", "/ready", "/metrics"]
+        # One pass over the message for all paths
+        self._pattern = re.compile("|".join(re.escape(path) for path in self.paths_to_exclude))
     
     def filter(self, record: logging.LogRecord) -> bool:
         """Return False to exclude the log record"""
-        message = record.getMessage()
-        
-        # Check if any excluded path is in the log message
-        for path in self.paths_to_exclude:
-            if path in message:
-                return False
-        
-        return True
\ No newline at end of file
+        # Most records carry the path in the raw message; only format when it's in the args
+        if self._pattern.search(str(record.msg)):
+            return False
+        if not record.args:
+            return True
+        return self._pattern.search(record.getMessage()) is None
\ No newline at end of file
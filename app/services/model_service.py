@@ -1,43 +1,310 @@
 import joblib
+import numpy as np
 import pandas as pd
 import logging
-import hashlib
-import json
+import threading
+import xxhash
+from cachetools import TTLCache
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import NamedTuple, Optional, Dict, List
+from sklearn.ensemble import RandomForestRegressor
 from app.core.config import settings
-from app.cache.redis_cache import get_cached_prediction, set_cached_prediction
+from app.cache.redis_cache import (
+    get_cached_prediction, set_cached_prediction,
+    get_cached_predictions_bulk, set_cached_predictions_bulk
+)
 from app.core.custom_exceptions import ModelNotLoadedException, PredictionException
 
+# Optional: JIT-compiled tree walk for TreeArrays, NumPy traversal without it
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 # Global model variable
 _model = None
+# File the model was actually loaded from (joblib pipeline or forest arrays)
+_model_source = None
+
+# Pipeline steps, cached at load so predictions skip Pipeline.predict dispatch
+_PRE = None
+_REG = None
+# Compiled (treelite) replacement for _REG.predict, if one was built
+_FOREST = None
+# Dict/NumPy re-implementation of _PRE for one row, see build_row_encoder()
+_ENCODE = None
+# dtype of the features handed to _REG: float32 only for forests that split in float32
+_FEATURE_DTYPE = np.float64
+# (company, year, fuel) -> mean price for buckets tight enough to skip the model
+_BUCKETS: Dict[tuple, float] = {}
+
+# Model input features, in the order used for cache keys
+FIELDS = (
+    'company', 'year', 'owner', 'fuel', 'seller_type',
+    'transmission', 'km_driven', 'mileage_mpg', 'engine_cc',
+    'max_power_bhp', 'torque_nm', 'seats'
+)
+CATEGORICAL_FIELDS = frozenset({'company', 'owner', 'fuel', 'seller_type', 'transmission'})
+REQUIRED_FIELDS = frozenset(FIELDS)
+
+# Per-thread one-row input frame, overwritten in place for single predictions
+_local = threading.local()
+
+# batch_predict limits: larger requests are rejected, the rest are scored in
+# chunks big enough to vectorize but small enough to keep each round trip short
+MAX_BATCH = 4096
+OPT_BATCH = 128
+
+# In-process L1 in front of Redis: cache_key -> predicted price
+_local_predictions = TTLCache(maxsize=8192, ttl=300)
+_local_predictions_lock = threading.Lock()
+
+if njit is not None:
+    # No parallel=True: predictions already run on many threadpool threads at once,
+    # and numba's workqueue layer aborts the process on concurrent parallel calls
+    @njit(cache=True, fastmath=True)
+    def _walk_forest(x, left, right, feature, threshold, value, roots):
+        """One native call per batch: each row walks every tree"""
+        out = np.empty(x.shape[0])
+        for i in range(x.shape[0]):
+            acc = 0.0
+            for t in range(roots.size):
+                node = roots[t]
+                while left[node] >= 0:
+                    if x[i, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                acc += value[node]
+            out[i] = acc / roots.size
+        return out
+else:
+    _walk_forest = None
+
+class TreeArrays(NamedTuple):
+    """
+    Random forest as flat node arrays (views into one memory-mapped file)
+    Child indices are global across trees, -1 marks a leaf
+    """
+    left: np.ndarray
+    right: np.ndarray
+    feature: np.ndarray
+    threshold: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Walk every tree for every row one level per step, then average the leaf values"""
+        x = np.asarray(features)
+        if _walk_forest is not None:
+            return _walk_forest(x, *self)
+        rows = np.arange(len(x))[:, None]
+        node = np.tile(self.roots, (len(x), 1))
+        while True:
+            left = self.left[node]
+            leaf = left < 0
+            if leaf.all():
+                break
+            # Leaves carry feature -2; whatever they read is discarded by the where()
+            go_left = x[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(leaf, node, np.where(go_left, left, self.right[node]))
+        return self.value[node].mean(axis=1)
 
 def load_model():
     """
     Load the ML model from disk
+    Uses the memory-mapped forest arrays and standalone preprocessor when
+    train_model.py exported them, otherwise the joblib pipeline
     Raises ModelNotLoadedException if model file not found
     """
-    global _model
+    global _model, _model_source, _PRE, _REG, _FOREST, _ENCODE, _BUCKETS, _FEATURE_DTYPE
     
     if _model is not None:
         return _model
     
+    trees = load_tree_arrays()
     model_path = Path(settings.MODEL_PATH)
     
-    if not model_path.exists():
+    if trees is None and not model_path.exists():
         logger.error(f"Model file not found at: {settings.MODEL_PATH}")
         raise ModelNotLoadedException(f"Model file not found: {settings.MODEL_PATH}")
     
     try:
-        _model = joblib.load(settings.MODEL_PATH)
-        logger.info(f"✅ Model loaded successfully from {settings.MODEL_PATH}")
+        if trees is not None:
+            # Only the preprocessor is unpickled; the trees stay in the page cache
+            _PRE = joblib.load(settings.PREPROCESSOR_PATH)
+            _model = _REG = trees
+            source = f"{settings.FOREST_PATH}, {settings.PREPROCESSOR_PATH}"
+        else:
+            _model = joblib.load(settings.MODEL_PATH)
+            steps = getattr(_model, 'named_steps', {})
+            _PRE, _REG = steps.get('pre_pro'), steps.get('regressor')
+            source = settings.MODEL_PATH
+        _FOREST = load_compiled_forest()
+        _FEATURE_DTYPE = feature_dtype(_REG)
+        _ENCODE = build_row_encoder(_PRE, _FEATURE_DTYPE) if _REG is not None else None
+        _BUCKETS = load_bucket_means()
+        _model_source = source
+        logger.info(f"✅ Model loaded successfully from {source}")
         return _model
     except Exception as e:
         logger.error(f"Failed to load model: {str(e)}")
         raise ModelNotLoadedException(f"Failed to load model: {str(e)}")
     
+def load_tree_arrays() -> Optional[TreeArrays]:
+    """
+    Memory-map the forest node array written by train_model.py
+    Returns None (use the joblib pipeline) unless it and the preprocessor both exist
+    """
+    global _walk_forest
+    
+    forest_path = Path(settings.FOREST_PATH)
+    if not (forest_path.exists() and Path(settings.PREPROCESSOR_PATH).exists()):
+        return None
+    
+    try:
+        nodes = np.load(forest_path, mmap_mode='r')
+        left, right = nodes['left'], nodes['right']
+        # Roots are the nodes no other node points to, in tree order
+        children = np.concatenate([left[left >= 0], right[right >= 0]])
+        roots = np.setdiff1d(np.arange(len(nodes)), children)
+    except Exception as e:
+        logger.warning(f"Forest arrays not used: {str(e)}")
+        return None
+    
+    trees = TreeArrays(
+        left=left, right=right, feature=nodes['feature'],
+        threshold=nodes['threshold'], value=nodes['value'], roots=roots
+    )
+    if _walk_forest is not None:
+        # Compile (or load the cached build) now rather than on the first request
+        try:
+            trees.predict(np.zeros((1, int(trees.feature.max()) + 1), dtype=np.float32))
+        except Exception as e:
+            logger.warning(f"Numba forest walk not used: {str(e)}")
+            _walk_forest = None
+    return trees
+
+def load_compiled_forest():
+    """
+    Load the treelite-compiled forest if it was built and tl2cgen is installed
+    Returns a predict(features) callable, or None to keep using sklearn
+    """
+    lib_path = Path(settings.COMPILED_MODEL_PATH)
+    if not lib_path.exists():
+        return None
+    
+    try:
+        import tl2cgen
+        predictor = tl2cgen.Predictor(str(lib_path), nthread=1)
+    except Exception as e:
+        logger.warning(f"Compiled forest not used: {str(e)}")
+        return None
+    
+    def predict(features):
+        return predictor.predict(tl2cgen.DMatrix(features, dtype='float32')).reshape(-1)
+    
+    logger.info(f"✅ Compiled forest loaded from {settings.COMPILED_MODEL_PATH}")
+    return predict
+    
+def load_bucket_means() -> Dict[tuple, float]:
+    """
+    Load the bucket stats written by train_model.py and keep the buckets whose
+    spread (std / mean) and size make their mean a good enough prediction
+    Returns an empty dict (early exit off) if the stats weren't built
+    """
+    buckets_path = Path(settings.BUCKETS_PATH)
+    if not buckets_path.exists():
+        return {}
+    
+    try:
+        stats = joblib.load(buckets_path)
+        tight = stats[
+            (stats['std'] / stats['mean'] < settings.BUCKET_MAX_CV)
+            & (stats['count'] >= settings.BUCKET_MIN_COUNT)
+        ]
+    except Exception as e:
+        logger.warning(f"Bucket stats not used: {str(e)}")
+        return {}
+    
+    logger.info(f"✅ {len(tight)} of {len(stats)} price buckets eligible for early exit")
+    return {
+        (company, int(year), fuel): float(mean)
+        for (company, year, fuel), mean in tight['mean'].items()
+    }
+
+def _bucket_price(data: dict) -> Optional[float]:
+    """Mean price of the car's (company, year, fuel) bucket if it's tight enough, else None"""
+    if not _BUCKETS:
+        return None
+    return _BUCKETS.get((data['company'], data['year'], data['fuel']))
+
+def feature_dtype(regressor) -> type:
+    """
+    sklearn forests (and their array export) compare features in float32, so
+    casting up front is exact; anything else, e.g. LightGBM with float64
+    thresholds, gets float64 so rows can't cross a split through rounding
+    """
+    if isinstance(regressor, (RandomForestRegressor, TreeArrays)):
+        return np.float32
+    return np.float64
+
+def build_row_encoder(preprocessor, dtype=np.float32):
+    """
+    Turn the fitted pre_pro ColumnTransformer into a plain function for one row:
+    median impute + standard scale for numbers, a dict lookup per one-hot column
+    Returns None if the preprocessor isn't the shape train_model.py builds
+    """
+    try:
+        columns = {name: cols for name, _, cols in preprocessor.transformers_}
+        num_pipeline = preprocessor.named_transformers_['num_col_pp']
+        cat_pipeline = preprocessor.named_transformers_['cat_col_pp']
+        num_cols = list(columns['num_col_pp'])
+        cat_cols = list(columns['cat_col_pp'])
+        medians = num_pipeline.named_steps['imputer'].statistics_
+        scaler = num_pipeline.named_steps['scalar']
+        fill_value = cat_pipeline.named_steps['imputer'].fill_value
+        encoder = cat_pipeline.named_steps['encoder']
+    except (AttributeError, KeyError):
+        return None
+    
+    if (
+        preprocessor.remainder != 'drop'
+        or not (scaler.with_mean and scaler.with_std)
+        or encoder.drop_idx_ is not None
+        or getattr(encoder, '_infrequent_enabled', False)
+    ):
+        return None
+    
+    n_num = len(num_cols)
+    mean, scale = scaler.mean_, scaler.scale_
+    lookups = []  # (column, offset of its first one-hot slot, {category: index})
+    offset = n_num
+    for col, categories in zip(cat_cols, encoder.categories_):
+        lookups.append((col, offset, {category: i for i, category in enumerate(categories)}))
+        offset += len(categories)
+    width = offset
+    
+    def encode(data: dict) -> np.ndarray:
+        row = np.zeros((1, width))
+        for j, col in enumerate(num_cols):
+            value = data[col]
+            # None / NaN -> training median, like SimpleImputer
+            row[0, j] = medians[j] if value is None or value != value else value
+        row[0, :n_num] = (row[0, :n_num] - mean) / scale
+        for col, start, lookup in lookups:
+            value = data[col]
+            index = lookup.get(fill_value if value is None else value)
+            # Unknown categories stay all-zero (handle_unknown='ignore')
+            if index is not None:
+                row[0, start + index] = 1.0
+        return row.astype(dtype, copy=False)
+    
+    return encode
+
 def get_model():
     """
     Get the loaded model instance
@@ -50,40 +317,85 @@ def get_model():
 def generate_cache_key(data: dict) -> str:
     """
     Generate a consistent cache key from input data
-    Uses hash for better key management
+    Hashes the feature values in FIELDS order, so key order in `data` doesn't matter
+    """
+    return _cache_key_from_tuple(tuple(data[field] for field in FIELDS))
+
+@lru_cache(maxsize=4096)
+def _cache_key_from_tuple(values: tuple) -> str:
+    """Hash feature values into a cache key, memoized for repeat payloads"""
+    return "prediction:" + xxhash.xxh3_64_hexdigest(repr(values).encode())
+
+def _predict_features(features: np.ndarray):
+    """Run the regressor (compiled if available) on preprocessed features"""
+    if _FOREST is not None:
+        return _FOREST(features)
+    return _REG.predict(features)
+
+def _run_model(model, input_data: pd.DataFrame):
+    """
+    Predict with the cached preprocessor/regressor pair when the model is
+    the expected pre_pro -> regressor pipeline, else through model.predict
+    """
+    if _PRE is not None and _REG is not None:
+        # float32 for sklearn forests saves their own copy, see feature_dtype()
+        features = np.asarray(_PRE.transform(input_data), dtype=_FEATURE_DTYPE)
+        return _predict_features(features)
+    return model.predict(input_data)
+
+def _predict_row(model, data: dict) -> float:
+    """Predict a single car, skipping the DataFrame/ColumnTransformer when possible"""
+    if _ENCODE is not None:
+        return float(_predict_features(_ENCODE(data))[0])
+    return float(_run_model(model, _input_frame(data))[0])
+
+def _input_frame(data: dict) -> pd.DataFrame:
+    """
+    Fill this thread's one-row template with `data`
+    Skips the dtype inference and index building of pd.DataFrame([data])
     """
-    # Sort keys for consistency
-    sorted_data = {k: data[k] for k in sorted(data.keys())}
-    data_str = json.dumps(sorted_data, sort_keys=True)
+    frame = getattr(_local, 'frame', None)
+    if frame is None:
+        frame = pd.DataFrame({
+            field: pd.Series([None], dtype=object if field in CATEGORICAL_FIELDS else 'float64')
+            for field in FIELDS
+        })
+        _local.frame = frame
     
-    # Generate hash for clean cache key
-    hash_key = hashlib.md5(data_str.encode()).hexdigest()
-    return f"prediction:{hash_key}"
+    for col, field in enumerate(FIELDS):
+        frame.iat[0, col] = data[field]
+    return frame
+
+def _get_local_prediction(cache_key: str) -> Optional[float]:
+    """Look up a prediction in the in-process cache"""
+    with _local_predictions_lock:
+        return _local_predictions.get(cache_key)
+
+def _set_local_predictions(predictions: Dict[str, float]) -> None:
+    """Store predictions in the in-process cache"""
+    with _local_predictions_lock:
+        _local_predictions.update(predictions)
 
 def validate_input_data(data: dict) -> None:
     """
     Validate input data before prediction
     """
-    required_fields = [
-        'company', 'year', 'owner', 'fuel', 'seller_type',
-        'transmission', 'km_driven', 'mileage_mpg', 'engine_cc',
-        'max_power_bhp', 'torque_nm', 'seats'
-    ]
-    
-    # Check for missing fields
-    missing_fields = [field for field in required_fields if field not in data]
+    # Check for missing fields (set difference runs in C, empty on the happy path)
+    missing_fields = REQUIRED_FIELDS.difference(data)
     if missing_fields:
-        raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+        raise ValueError(f"Missing required fields: {', '.join(sorted(missing_fields))}")
     
-    # Validate numeric fields
-    if data['year'] < 1900 or data['year'] > 2030:
-        raise ValueError(f"Invalid year: {data['year']}. Must be between 1900 and 2030")
+    # Validate numeric fields, each value read once
+    year, km_driven, seats = data['year'], data['km_driven'], data['seats']
     
-    if data['km_driven'] < 0:
-        raise ValueError(f"Invalid km_driven: {data['km_driven']}. Cannot be negative")
+    if not 1900 <= year <= 2030:
+        raise ValueError(f"Invalid year: {year}. Must be between 1900 and 2030")
     
-    if data['seats'] < 2 or data['seats'] > 10:
-        raise ValueError(f"Invalid seats: {data['seats']}. Must be between 2 and 10")
+    if km_driven < 0:
+        raise ValueError(f"Invalid km_driven: {km_driven}. Cannot be negative")
+    
+    if not 2 <= seats <= 10:
+        raise ValueError(f"Invalid seats: {seats}. Must be between 2 and 10")
 
 def predict_car_price(data: dict) -> float:
     """
@@ -106,10 +418,15 @@ def predict_car_price(data: dict) -> float:
         # Generate cache key
         cache_key = generate_cache_key(data)
         
-        # Check cache
+        # Check the in-process cache, then Redis
+        cached = _get_local_prediction(cache_key)
+        if cached is not None:
+            return cached
+        
         cached = get_cached_prediction(cache_key)
         if cached is not None:
             logger.info(f"Cache hit for key: {cache_key}")
+            _set_local_predictions({cache_key: float(cached)})
             return float(cached)
         
         logger.info(f"Cache miss for key: {cache_key}")
@@ -117,17 +434,18 @@ def predict_car_price(data: dict) -> float:
         # Get model
         model = get_model()
         
-        # Prepare input data
-        input_data = pd.DataFrame([data])
-        
-        # Make prediction
-        prediction = model.predict(input_data)[0]
-        prediction = float(prediction)
+        # Early exit: tight buckets answer with their mean, everything else runs the model
+        prediction = _bucket_price(data)
+        if prediction is not None:
+            logger.info(f"Bucket early exit: {prediction:.2f}")
+        else:
+            prediction = _predict_row(model, data)
+            logger.info(f"Prediction successful: {prediction:.2f}")
         
         # Cache the result
         set_cached_prediction(cache_key, prediction)
+        _set_local_predictions({cache_key: prediction})
         
-        logger.info(f"Prediction successful: {prediction:.2f}")
         return prediction
         
     except ValueError as e:
@@ -141,24 +459,121 @@ def predict_car_price(data: dict) -> float:
 
 def batch_predict(data_list: List[dict]) -> List[float]:
     """
-    Predict prices for multiple cars
+    Predict prices for multiple cars, OPT_BATCH at a time
     
     Args:
         data_list: List of dictionaries containing car features
         
     Returns:
-        List of predicted prices
+        List of predicted prices (None for items that failed)
+        
+    Raises:
+        ValueError: If more than MAX_BATCH cars are sent
     """
+    if len(data_list) > MAX_BATCH:
+        raise ValueError(f"Batch too large: {len(data_list)} cars. Maximum is {MAX_BATCH}")
+    
     predictions = []
+    for start in range(0, len(data_list), OPT_BATCH):
+        predictions.extend(_predict_chunk(data_list[start:start + OPT_BATCH]))
+    return predictions
+
+def _predict_chunk(data_list: List[dict]) -> List[float]:
+    """
+    Predict one chunk of a batch
+    Keys found in the in-process cache skip Redis, Redis reads/writes are one
+    round trip each, cache misses go through the model as one DataFrame, and
+    identical cars in a chunk are scored once
+    """
+    predictions = [None] * len(data_list)
+    rows: Dict[str, tuple] = {}  # cache_key -> (data, indices)
     
-    for data in data_list:
+    for i, data in enumerate(data_list):
         try:
-            prediction = predict_car_price(data)
-            predictions.append(prediction)
+            validate_input_data(data)
+            cache_key = generate_cache_key(data)
         except Exception as e:
             logger.error(f"Batch prediction error for data {data}: {str(e)}")
-            predictions.append(None)
+            continue
+        
+        if cache_key in rows:
+            rows[cache_key][1].append(i)
+        else:
+            rows[cache_key] = (data, [i])
+    
+    if not rows:
+        return predictions
+    
+    # In-process cache first; only what's left goes to Redis
+    keys = []
+    for cache_key, (_, indices) in rows.items():
+        cached = _get_local_prediction(cache_key)
+        if cached is None:
+            keys.append(cache_key)
+            continue
+        for i in indices:
+            predictions[i] = cached
+    
+    if not keys:
+        return predictions
+    
+    try:
+        cached_values = get_cached_predictions_bulk(keys)
+    except Exception as e:
+        logger.warning(f"Batch cache lookup failed: {str(e)}")
+        cached_values = [None] * len(keys)
+    
+    misses = []
+    redis_hits = {}
+    for cache_key, cached in zip(keys, cached_values):
+        if cached is None:
+            misses.append(cache_key)
+            continue
+        redis_hits[cache_key] = float(cached)
+        for i in rows[cache_key][1]:
+            predictions[i] = redis_hits[cache_key]
+    _set_local_predictions(redis_hits)
+    
+    if not misses:
+        return predictions
+    
+    # Same early exit as predict_car_price, so a key scores the same on either path
+    scored = {}
+    remaining = []
+    for cache_key in misses:
+        bucket_price = _bucket_price(rows[cache_key][0])
+        if bucket_price is None:
+            remaining.append(cache_key)
+        else:
+            scored[cache_key] = bucket_price
     
+    if remaining:
+        try:
+            model = get_model()
+            input_data = pd.DataFrame([rows[cache_key][0] for cache_key in remaining])
+            results = _run_model(model, input_data)
+        except Exception as e:
+            logger.error(f"Batch prediction failed for {len(remaining)} items: {str(e)}")
+            remaining, results = [], []
+        scored.update(zip(remaining, map(float, results)))
+    
+    if not scored:
+        return predictions
+    
+    for cache_key, prediction in scored.items():
+        for i in rows[cache_key][1]:
+            predictions[i] = prediction
+    
+    _set_local_predictions(scored)
+    try:
+        set_cached_predictions_bulk(scored)
+    except Exception as e:
+        logger.warning(f"Failed to cache {len(scored)} batch predictions: {str(e)}")
+    
+    logger.info(
+        f"Batch prediction: {len(scored) - len(remaining)} bucket exits, "
+        f"{len(remaining)} scored, {len(data_list)} requested"
+    )
     return predictions
 
 def get_model_info() -> Dict:
@@ -169,7 +584,7 @@ def get_model_info() -> Dict:
         model = get_model()
         return {
             "model_type": type(model).__name__,
-            "model_path": settings.MODEL_PATH,
+            "model_path": _model_source or settings.MODEL_PATH,
             "version": settings.MODEL_VERSION,
             "is_loaded": _model is not None
         }
@@ -178,10 +593,3 @@ def get_model_info() -> Dict:
             "error": str(e),
             "is_loaded": False
         }
-
-
-# Load model on module import
-try:
-    load_model()
-except Exception as e:
-    logger.warning(f"Model not loaded on startup: {str(e)}")
\ No newline at end of file
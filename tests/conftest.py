@@ -1,16 +1,52 @@
 """
 Pytest configuration and shared fixtures
 """
+import os
+import tempfile
+from pathlib import Path
+
+# Fresh SQLite file per xdist worker (pytest -n auto), set before the app reads settings.
+# Workers inherit the controller's environment, so they always override it.
+_worker = os.environ.get("PYTEST_XDIST_WORKER")
+if _worker or "DATABASE_URL" not in os.environ:
+    _test_db = Path(tempfile.gettempdir()) / f"test_{_worker or 'main'}.db"
+    _test_db.unlink(missing_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{_test_db}"
+
+import numpy as np
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from unittest.mock import Mock, patch
+from httpx import ASGITransport, AsyncClient
 from app.main import app
+from app.services import model_service
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mock_model():
+    """Stand-in for the joblib model so the test session never loads it from disk"""
+    model = Mock()
+    model.predict.side_effect = lambda X: np.full(len(X), 450000.0)
+    with patch.object(model_service, "_model", model):
+        yield model
 
 
-@pytest.fixture(scope="session")
-def test_client():
-    """Create a test client for the FastAPI app"""
-    with TestClient(app) as client:
-        yield client
+# Account every session starts with (the test DB is fresh each run)
+TEST_USER = {
+    "username": "testuser",
+    "email": "test@example.com",
+    "password": "testpass123"
+}
+
+
+@pytest_asyncio.fixture(scope="session")
+async def test_client():
+    """Async client calling the app in-process over ASGI (no server, no sync bridge)"""
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/register", json=TEST_USER)
+            assert response.status_code == 201, response.text
+            yield client
 
 
 @pytest.fixture
@@ -60,9 +96,5 @@ def auth_headers(mock_jwt_token):
 
 @pytest.fixture
 def sample_user_data():
-    """Sample user data for auth tests"""
-    return {
-        "username": "testuser",
-        "email": "test@example.com",
-        "password": "testpass123"
-    }
\ No newline at end of file
+    """Sample user data for auth tests (already registered, see TEST_USER)"""
+    return dict(TEST_USER)
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Tests for security helpers
+"""
+import hmac
+from unittest.mock import Mock, patch
+from argon2 import PasswordHasher
+from app.core import security
+from app.core.security import (
+    safe_eq, hash_password, verify_password, password_needs_rehash, create_token, verify_token
+)
+
+
+def test_safe_eq_matches_equal_strings():
+    """Test identical secrets compare equal"""
+    assert safe_eq("demo-key", "demo-key")
+
+
+def test_safe_eq_rejects_different_strings():
+    """Test different secrets and lengths compare unequal"""
+    assert not safe_eq("demo-key", "demo-kez")
+    assert not safe_eq("demo-key", "demo-key-longer")
+    assert not safe_eq("demo-key", "")
+
+
+def test_safe_eq_uses_constant_time_compare():
+    """Test safe_eq delegates to hmac.compare_digest instead of =="""
+    with patch("app.core.security.hmac.compare_digest", wraps=hmac.compare_digest) as compare:
+        assert safe_eq("demo-key", "demo-key")
+
+    compare.assert_called_once_with(b"demo-key", b"demo-key")
+
+
+def test_verify_password_cache_hit_skips_hashing():
+    """Test repeated correct credentials are answered without another Argon2 verify"""
+    hashed = hash_password("secret123")
+    security._verify_cache.clear()
+
+    with patch.object(security, "ph", Mock(wraps=security.ph)) as ph:
+        assert verify_password("secret123", hashed)
+        assert verify_password("secret123", hashed)
+
+    assert ph.verify.call_count == 1
+
+
+def test_verify_password_cache_not_reused_for_wrong_password():
+    """Test a cached success is never returned for a different password"""
+    hashed = hash_password("secret123")
+    security._verify_cache.clear()
+
+    with patch.object(security, "ph", Mock(wraps=security.ph)) as ph:
+        assert verify_password("secret123", hashed)
+        assert not verify_password("wrong-pass", hashed)
+
+    assert ph.verify.call_count == 2
+
+
+def test_verify_password_roundtrip():
+    """Test hashed password verifies and wrong password doesn't"""
+    hashed = hash_password("secret123")
+
+    assert verify_password("secret123", hashed)
+    assert not verify_password("wrong-pass", hashed)
+
+
+def test_verify_password_malformed_hash():
+    """Test a corrupt stored hash fails verification instead of raising"""
+    assert not verify_password("secret123", "not-an-argon2-hash")
+    assert not verify_password("secret123", "$2b$12$" + "x" * 53)
+
+
+def test_password_needs_rehash_on_parameter_change():
+    """Test hashes made with other Argon2 parameters are flagged for upgrade"""
+    assert not password_needs_rehash(hash_password("secret123"))
+    assert password_needs_rehash(PasswordHasher(time_cost=3).hash("secret123"))
+
+
+def test_verify_token_roundtrip_and_cache():
+    """Test a valid token decodes, and decodes the same again from the cache"""
+    token = create_token({"sub": "alice", "user_id": 1})
+
+    first = verify_token(token)
+    second = verify_token(token)
+
+    assert first["sub"] == "alice"
+    assert second == first
+
+
+def test_verify_token_rejects_tampered_token():
+    """Test a token with a broken signature is rejected every time"""
+    token = create_token({"sub": "alice"})
+    tampered = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+
+    assert verify_token(tampered) is None
+    assert verify_token(tampered) is None
@@ -3,16 +3,21 @@ Tests for authentication routes
 """
 import pytest
 from fastapi import status
+from sqlalchemy import delete
+from app.core.database import SessionLocal
+from app.database.models import User
 
+pytestmark = pytest.mark.asyncio
 
-def test_login_success(test_client, sample_user_data):
+
+async def test_login_success(test_client, sample_user_data):
     """Test successful login"""
     login_data = {
         "username": sample_user_data["username"],
         "password": sample_user_data["password"]
     }
     
-    response = test_client.post("/login", json=login_data)
+    response = await test_client.post("/login", json=login_data)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -20,37 +25,37 @@ def test_login_success(test_client, sample_user_data):
     assert data["token_type"] == "bearer"
 
 
-def test_login_invalid_credentials(test_client):
+async def test_login_invalid_credentials(test_client):
     """Test login with wrong credentials"""
     login_data = {
         "username": "wronguser",
         "password": "wrongpass"
     }
     
-    response = test_client.post("/login", json=login_data)
+    response = await test_client.post("/login", json=login_data)
     
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
-def test_login_missing_username(test_client):
+async def test_login_missing_username(test_client):
     """Test login without username"""
     login_data = {"password": "testpass"}
     
-    response = test_client.post("/login", json=login_data)
+    response = await test_client.post("/login", json=login_data)
     
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
-def test_login_missing_password(test_client):
+async def test_login_missing_password(test_client):
     """Test login without password"""
     login_data = {"username": "testuser"}
     
-    response = test_client.post("/login", json=login_data)
+    response = await test_client.post("/login", json=login_data)
     
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
-def test_register_success(test_client):
+async def test_register_success(test_client):
     """Test successful user registration"""
     register_data = {
         "username": "newuser",
@@ -58,21 +63,21 @@ def test_register_success(test_client):
         "password": "securepass123"
     }
     
-    response = test_client.post("/register", json=register_data)
+    response = await test_client.post("/register", json=register_data)
     
     assert response.status_code == status.HTTP_201_CREATED
     data = response.json()
     assert "id" in data or "username" in data
 
 
-def test_register_duplicate_username(test_client, sample_user_data):
+async def test_register_duplicate_username(test_client, sample_user_data):
     """Test registration with existing username"""
-    response = test_client.post("/register", json=sample_user_data)
+    response = await test_client.post("/register", json=sample_user_data)
     
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
-def test_register_invalid_email(test_client):
+async def test_register_invalid_email(test_client):
     """Test registration with invalid email"""
     register_data = {
         "username": "testuser",
@@ -80,12 +85,12 @@ def test_register_invalid_email(test_client):
         "password": "pass123"
     }
     
-    response = test_client.post("/register", json=register_data)
+    response = await test_client.post("/register", json=register_data)
     
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
-def test_register_weak_password(test_client):
+async def test_register_weak_password(test_client):
     """Test registration with weak password"""
     register_data = {
         "username": "testuser",
@@ -93,7 +98,26 @@ def test_register_weak_password(test_client):
         "password": "123"
     }
     
-    response = test_client.post("/register", json=register_data)
+    response = await test_client.post("/register", json=register_data)
     
     # Should fail validation if password requirements exist
-    assert response.status_code in [status.HTTP_400_BAD_REQUEST, status.HTTP_422_UNPROCESSABLE_ENTITY]
\ No newline at end of file
+    assert response.status_code in [status.HTTP_400_BAD_REQUEST, status.HTTP_422_UNPROCESSABLE_ENTITY]
+
+async def test_me_after_user_deleted(test_client):
+    """Test /me and /me/update reject a token whose user was deleted while cached"""
+    user_data = {"username": "deleteduser", "email": "deleted@example.com", "password": "pass1234"}
+    await test_client.post("/register", json=user_data)
+    login = await test_client.post("/login", json={"username": "deleteduser", "password": "pass1234"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    
+    # Warm the user cache, then delete the row behind it
+    assert (await test_client.get("/me", headers=headers)).status_code == status.HTTP_200_OK
+    async with SessionLocal() as db:
+        await db.execute(delete(User).where(User.username == "deleteduser"))
+        await db.commit()
+    
+    response = await test_client.get("/me", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    response = await test_client.put("/me/update", json={"email": "new@example.com"}, headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,51 @@
+"""
+Tests for telling duplicate usernames from duplicate emails on register
+"""
+from types import SimpleNamespace
+from sqlalchemy.exc import IntegrityError
+from app.api.routes_auth import _duplicate_field
+
+
+def integrity_error(orig):
+    """Wrap a driver error the way SQLAlchemy raises it"""
+    return IntegrityError("INSERT INTO users ...", {}, orig)
+
+
+class DriverError(Exception):
+    """Stand-in for a DBAPI error"""
+
+
+def test_duplicate_field_sqlite_messages():
+    """Test SQLite's exact column messages"""
+    assert _duplicate_field(integrity_error(DriverError("UNIQUE constraint failed: users.email"))) == "email"
+    assert _duplicate_field(integrity_error(DriverError("UNIQUE constraint failed: users.username"))) == "username"
+
+
+def test_duplicate_field_postgres_constraint_name():
+    """Test asyncpg's constraint name wins over a message that mentions email"""
+    cause = DriverError('duplicate key value violates unique constraint "ix_users_username"')
+    cause.constraint_name = "ix_users_username"
+    orig = DriverError(
+        'duplicate key value violates unique constraint "ix_users_username"\n'
+        'DETAIL:  Key (username)=(myemail) already exists.'
+    )
+    orig.__cause__ = cause
+
+    assert _duplicate_field(integrity_error(orig)) == "username"
+
+
+def test_duplicate_field_psycopg_diag():
+    """Test psycopg's diag.constraint_name"""
+    orig = DriverError("duplicate key")
+    orig.diag = SimpleNamespace(constraint_name="ix_users_email")
+
+    assert _duplicate_field(integrity_error(orig)) == "email"
+
+
+def test_duplicate_field_other_errors_unrecognised():
+    """Test other integrity errors aren't reported as duplicates"""
+    assert _duplicate_field(integrity_error(DriverError("NOT NULL constraint failed: users.email"))) is None
+
+    orig = DriverError("null value in column")
+    orig.diag = SimpleNamespace(constraint_name=None)
+    assert _duplicate_field(integrity_error(orig)) is None
@@ -0,0 +1,113 @@
+"""
+Tests for the batch prediction path (dedupe, caches, chunking, limits)
+"""
+import pytest
+from unittest.mock import Mock
+from app.services import model_service
+from app.services.model_service import batch_predict, MAX_BATCH, OPT_BATCH
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Model whose price is the car's km_driven, so each result shows which row it came from"""
+    model = Mock()
+    model.predict.side_effect = lambda X: X['km_driven'].to_numpy(dtype=float)
+    monkeypatch.setattr(model_service, "_model", model)
+    return model
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    """Empty Redis: bulk reads miss, bulk writes are recorded"""
+    cache = Mock()
+    cache.get_bulk.side_effect = lambda keys: [None] * len(keys)
+    monkeypatch.setattr(model_service, "get_cached_predictions_bulk", cache.get_bulk)
+    monkeypatch.setattr(model_service, "set_cached_predictions_bulk", cache.set_bulk)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def empty_local_cache():
+    """Start every test with an empty in-process cache"""
+    model_service._local_predictions.clear()
+    yield
+    model_service._local_predictions.clear()
+
+
+def make_car(km_driven, **overrides):
+    """A valid car, told apart by km_driven"""
+    car = {
+        "company": "Maruti",
+        "year": 2015,
+        "owner": "First",
+        "fuel": "Petrol",
+        "seller_type": "Individual",
+        "transmission": "Manual",
+        "km_driven": float(km_driven),
+        "mileage_mpg": 55.0,
+        "engine_cc": 1200.0,
+        "max_power_bhp": 80.0,
+        "torque_nm": 190.0,
+        "seats": 5.0
+    }
+    return {**car, **overrides}
+
+
+def test_batch_scores_duplicates_once(model, redis_cache):
+    """Test identical cars are scored and cached once but returned in every slot"""
+    cars = [make_car(1000), make_car(2000), make_car(1000)]
+
+    assert batch_predict(cars) == [1000.0, 2000.0, 1000.0]
+    assert model.predict.call_count == 1
+    assert len(model.predict.call_args[0][0]) == 2
+    redis_cache.get_bulk.assert_called_once()
+    assert len(redis_cache.get_bulk.call_args[0][0]) == 2
+    assert sorted(redis_cache.set_bulk.call_args[0][0].values()) == [1000.0, 2000.0]
+
+
+def test_batch_keeps_none_for_invalid_row(model, redis_cache):
+    """Test an invalid car in the middle fails alone and keeps its position"""
+    cars = [make_car(1000), make_car(2000, year=1800), make_car(3000)]
+
+    assert batch_predict(cars) == [1000.0, None, 3000.0]
+
+
+def test_batch_uses_caches(model, redis_cache):
+    """Test Redis hits skip the model and repeats are served from the in-process cache"""
+    cars = [make_car(1000), make_car(2000)]
+    redis_cache.get_bulk.side_effect = lambda keys: [123.0] + [None] * (len(keys) - 1)
+
+    assert batch_predict(cars) == [123.0, 2000.0]
+    assert len(model.predict.call_args[0][0]) == 1
+
+    model.predict.reset_mock()
+    redis_cache.get_bulk.reset_mock()
+    assert batch_predict(cars) == [123.0, 2000.0]
+    model.predict.assert_not_called()
+    redis_cache.get_bulk.assert_not_called()
+
+
+def test_batch_longer_than_opt_batch_is_chunked(model, redis_cache):
+    """Test a long batch is scored OPT_BATCH cars per model call, in order"""
+    cars = [make_car(km) for km in range(2 * OPT_BATCH + 5)]
+
+    assert batch_predict(cars) == [float(km) for km in range(len(cars))]
+    assert model.predict.call_count == 3
+    assert [len(call[0][0]) for call in model.predict.call_args_list] == [OPT_BATCH, OPT_BATCH, 5]
+
+
+def test_batch_over_max_batch_raises(model, redis_cache):
+    """Test batches above MAX_BATCH are rejected before any work"""
+    with pytest.raises(ValueError):
+        batch_predict([make_car(1000)] * (MAX_BATCH + 1))
+
+    model.predict.assert_not_called()
+    redis_cache.get_bulk.assert_not_called()
+
+
+def test_batch_survives_redis_errors(model, redis_cache):
+    """Test a failing Redis falls back to scoring every car"""
+    redis_cache.get_bulk.side_effect = ConnectionError("redis down")
+    redis_cache.set_bulk.side_effect = ConnectionError("redis down")
+
+    assert batch_predict([make_car(1000), make_car(2000)]) == [1000.0, 2000.0]
@@ -0,0 +1,132 @@
+"""
+Tests for the one-row encoder that stands in for the pre_pro ColumnTransformer
+"""
+from pathlib import Path
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from app.services.model_service import FIELDS, CATEGORICAL_FIELDS, build_row_encoder, feature_dtype
+
+
+@pytest.fixture(scope="module")
+def preprocessor():
+    """pre_pro built the way training/train_model.py builds it, fitted on a few cars"""
+    rng = np.random.default_rng(0)
+    n = 60
+    frame = pd.DataFrame({
+        "company": rng.choice(["Maruti", "Hyundai", "Honda", "BMW"], n),
+        "year": rng.integers(2005, 2021, n),
+        "owner": rng.choice(["First", "Second", "Third"], n),
+        "fuel": rng.choice(["Petrol", "Diesel", "CNG"], n),
+        "seller_type": rng.choice(["Individual", "Dealer"], n),
+        "transmission": rng.choice(["Manual", "Automatic"], n),
+        "km_driven": rng.integers(1000, 200000, n).astype(float),
+        "mileage_mpg": rng.uniform(30, 70, n),
+        "engine_cc": rng.integers(800, 3000, n).astype(float),
+        "max_power_bhp": rng.uniform(40, 250, n),
+        "torque_nm": rng.uniform(80, 500, n),
+        "seats": rng.choice([4.0, 5.0, 7.0], n),
+    })
+    frame.loc[::7, "mileage_mpg"] = np.nan
+
+    num_cols = [field for field in FIELDS if field not in CATEGORICAL_FIELDS]
+    cat_cols = [field for field in FIELDS if field in CATEGORICAL_FIELDS]
+    pre = ColumnTransformer(transformers=[
+        ('num_col_pp', Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='median')),
+            ('scalar', StandardScaler())
+        ]), num_cols),
+        ('cat_col_pp', Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='constant', fill_value='missing')),
+            ('encoder', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+        ]), cat_cols)
+    ])
+    return pre.fit(frame)
+
+
+@pytest.fixture
+def car():
+    """A car every category of which was seen in training"""
+    return {
+        "company": "Honda",
+        "year": 2015,
+        "owner": "First",
+        "fuel": "Diesel",
+        "seller_type": "Dealer",
+        "transmission": "Manual",
+        "km_driven": 50000.0,
+        "mileage_mpg": 55.0,
+        "engine_cc": 1200.0,
+        "max_power_bhp": 80.0,
+        "torque_nm": 190.0,
+        "seats": 5.0
+    }
+
+
+def assert_encodes_like_transform(preprocessor, data):
+    encode = build_row_encoder(preprocessor)
+    frame = pd.DataFrame([data], columns=FIELDS)
+    expected = preprocessor.transform(frame)
+
+    np.testing.assert_allclose(encode(data), expected, rtol=1e-6, atol=1e-6)
+
+
+def test_encoder_built_for_training_layout(preprocessor):
+    """Test the train_model.py preprocessor gets an encoder"""
+    assert build_row_encoder(preprocessor) is not None
+
+
+def test_encoder_matches_transform_known_row(preprocessor, car):
+    """Test a row with known categories encodes like ColumnTransformer"""
+    assert_encodes_like_transform(preprocessor, car)
+
+
+def test_encoder_matches_transform_unknown_category(preprocessor, car):
+    """Test unseen categories stay all-zero like handle_unknown='ignore'"""
+    assert_encodes_like_transform(preprocessor, dict(car, company="Tesla", fuel="Electric"))
+
+
+def test_encoder_matches_transform_missing_numeric(preprocessor, car):
+    """Test missing numbers are imputed with the training median"""
+    assert_encodes_like_transform(preprocessor, dict(car, mileage_mpg=None, torque_nm=np.nan))
+
+
+def test_encoder_float64_for_other_regressors(preprocessor, car):
+    """Test non-forest regressors get float64 rows, exactly as transform() produces them"""
+    encode = build_row_encoder(preprocessor, feature_dtype(GradientBoostingRegressor()))
+    row = encode(car)
+
+    assert row.dtype == np.float64
+    np.testing.assert_array_equal(row, preprocessor.transform(pd.DataFrame([car], columns=FIELDS)))
+
+
+def test_feature_dtype_float32_only_for_forests():
+    """Test only sklearn forests get float32 features"""
+    assert feature_dtype(RandomForestRegressor()) is np.float32
+    assert feature_dtype(GradientBoostingRegressor()) is np.float64
+
+
+def test_encoder_rejects_other_layouts():
+    """Test a preprocessor that isn't the train_model.py shape gets no encoder"""
+    assert build_row_encoder(StandardScaler()) is None
+
+
+def test_encoder_matches_shipped_model():
+    """Test the encoder against the committed model on real training rows"""
+    model_path, data_path = Path("app/models/model.joblib"), Path("data/car-details.csv")
+    if not (model_path.exists() and data_path.exists()):
+        pytest.skip("model or training data not available")
+
+    preprocessor = joblib.load(model_path).named_steps['pre_pro']
+    frame = pd.read_csv(data_path, usecols=list(FIELDS), nrows=500)[list(FIELDS)]
+    encode = build_row_encoder(preprocessor)
+    expected = preprocessor.transform(frame)
+
+    for i, data in enumerate(frame.to_dict('records')):
+        np.testing.assert_allclose(encode(data)[0], expected[i], rtol=1e-6, atol=1e-6)
@@ -0,0 +1,71 @@
+"""
+Tests for serving the forest from memory-mapped node arrays
+"""
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from app.services import model_service
+from training.train_utils import forest_nodes
+
+
+@pytest.fixture(scope="module")
+def forest_data():
+    """A small fitted forest plus rows to score"""
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(300, 6)).astype(np.float32)
+    y = 3 * X[:, 0] - 2 * X[:, 3] + rng.normal(scale=0.1, size=300)
+    forest = RandomForestRegressor(n_estimators=9, max_depth=5, random_state=0).fit(X, y)
+    return forest, rng.normal(size=(200, 6)).astype(np.float32)
+
+
+@pytest.fixture
+def tree_arrays(forest_data, tmp_path, monkeypatch):
+    """Export the forest like train_model.py does and load it back through load_tree_arrays"""
+    forest, _ = forest_data
+    forest_path = tmp_path / "forest.npy"
+    preprocessor_path = tmp_path / "preprocessor.joblib"
+    np.save(forest_path, forest_nodes(forest))
+    preprocessor_path.touch()
+    monkeypatch.setattr(model_service, "settings", SimpleNamespace(
+        FOREST_PATH=str(forest_path), PREPROCESSOR_PATH=str(preprocessor_path)
+    ))
+    return model_service.load_tree_arrays
+
+
+def test_tree_arrays_find_one_root_per_tree(forest_data, tree_arrays):
+    """Test roots found from the child links are each tree's first node"""
+    forest, _ = forest_data
+    trees = tree_arrays()
+
+    offsets = np.cumsum([0] + [e.tree_.node_count for e in forest.estimators_[:-1]])
+    np.testing.assert_array_equal(trees.roots, offsets)
+
+
+def test_tree_arrays_numpy_walk_matches_sklearn(forest_data, tree_arrays, monkeypatch):
+    """Test the NumPy traversal predicts like RandomForestRegressor"""
+    monkeypatch.setattr(model_service, "_walk_forest", None)
+    forest, X = forest_data
+    trees = tree_arrays()
+
+    np.testing.assert_allclose(trees.predict(X), forest.predict(X), rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(trees.predict(X[:1]), forest.predict(X[:1]), rtol=1e-6, atol=1e-6)
+
+
+def test_tree_arrays_numba_walk_matches_sklearn(forest_data, tree_arrays):
+    """Test the numba traversal predicts like RandomForestRegressor"""
+    if model_service._walk_forest is None:
+        pytest.skip("numba not installed")
+    forest, X = forest_data
+    trees = tree_arrays()
+
+    np.testing.assert_allclose(trees.predict(X), forest.predict(X), rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(trees.predict(X[:1]), forest.predict(X[:1]), rtol=1e-6, atol=1e-6)
+
+
+def test_tree_arrays_missing_files(tmp_path, monkeypatch):
+    """Test no arrays are used unless both exports exist"""
+    monkeypatch.setattr(model_service, "settings", SimpleNamespace(
+        FOREST_PATH=str(tmp_path / "forest.npy"), PREPROCESSOR_PATH=str(tmp_path / "preprocessor.joblib")
+    ))
+    assert model_service.load_tree_arrays() is None
@@ -1,4 +1,6 @@
+import os
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
@@ -6,7 +8,10 @@ from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.ensemble import RandomForestRegressor
-from training.train_utils import MODEL_PATH, DATA_FILE_PATH, MODEL_DIR
+from training.train_utils import (
+    MODEL_PATH, DATA_FILE_PATH, MODEL_DIR, COMPILED_MODEL_PATH,
+    BUCKETS_PATH, FOREST_PATH, PREPROCESSOR_PATH, forest_nodes
+)
 
 df = (
     pd
@@ -38,11 +43,24 @@ preprocessor = ColumnTransformer(transformers=[
     ('cat_col_pp', cat_pipeline, cat_cols)
 ])
 
-regressor = RandomForestRegressor(
-    n_estimators= 21,
-    max_depth=5,
-    random_state=42
-)
+# REGRESSOR=lightgbm swaps in a LightGBM booster behind the same Pipeline surface.
+# lightgbm is not in requirements.txt: install it in the API image too, or the model won't load
+if os.getenv('REGRESSOR', 'rf').lower() == 'lightgbm':
+    from lightgbm import LGBMRegressor
+    regressor = LGBMRegressor(
+        n_estimators=200,
+        max_depth=6,
+        num_leaves=31,
+        random_state=42,
+        n_jobs=-1
+    )
+else:
+    regressor = RandomForestRegressor(
+        n_estimators= 21,
+        max_depth=5,
+        random_state=42,
+        n_jobs=-1
+    )
 
 rf_model = Pipeline(steps=[
     ('pre_pro', preprocessor),
@@ -51,6 +69,45 @@ rf_model = Pipeline(steps=[
 
 rf_model.fit(X_train, y_train)
 
+# Parallel fit, but predict single-threaded: at 21 shallow trees the joblib
+# thread pool costs more than it saves on the API's small batches
+# (LightGBM's OpenMP pool has the same overhead per call)
+rf_model.named_steps['regressor'].set_params(n_jobs=1)
+
 
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
-joblib.dump(rf_model, MODEL_PATH)
\ No newline at end of file
+joblib.dump(rf_model, MODEL_PATH)
+
+# Price stats per (company, year, fuel) bucket; the API answers tight buckets from the mean
+bucket_stats = df.groupby(['company', 'year', 'fuel'])['selling_price'].agg(['mean', 'std', 'count'])
+joblib.dump(bucket_stats, BUCKETS_PATH)
+
+# Forest exports for the API: node arrays (mmapped at load) and a native library
+regressor = rf_model.named_steps['regressor']
+if not isinstance(regressor, RandomForestRegressor):
+    # Stale exports would otherwise be served in place of the new booster
+    for path in (FOREST_PATH, PREPROCESSOR_PATH, COMPILED_MODEL_PATH):
+        path.unlink(missing_ok=True)
+    print("Forest exports only support RandomForestRegressor, skipping")
+else:
+    np.save(FOREST_PATH, forest_nodes(regressor))
+    joblib.dump(rf_model.named_steps['pre_pro'], PREPROCESSOR_PATH)
+    print("Forest arrays path:", FOREST_PATH)
+    
+    # Native library (optional: needs treelite + tl2cgen)
+    try:
+        import treelite.sklearn
+        import tl2cgen
+    except ImportError:
+        # An rf.so from an earlier run would otherwise shadow the new forest
+        COMPILED_MODEL_PATH.unlink(missing_ok=True)
+        print("treelite/tl2cgen not installed, skipping compiled forest export")
+    else:
+        tl_model = treelite.sklearn.import_model(regressor)
+        tl2cgen.export_lib(
+            tl_model,
+            toolchain='gcc',
+            libpath=str(COMPILED_MODEL_PATH),
+            params={'parallel_comp': 4}
+        )
+        print("Compiled forest path:", COMPILED_MODEL_PATH)
@@ -1,4 +1,5 @@
 from pathlib import Path
+import numpy as np
 
 # Directories
 DATA_DIR = Path('data')
@@ -8,6 +9,10 @@ MODEL_DIR = APP_DIR / 'models'
 # File paths
 DATA_FILE_PATH = DATA_DIR / 'car-details.csv'
 MODEL_PATH = MODEL_DIR / 'model.joblib'
+COMPILED_MODEL_PATH = MODEL_DIR / 'rf.so'
+BUCKETS_PATH = MODEL_DIR / 'buckets.pkl'
+FOREST_PATH = MODEL_DIR / 'forest.npy'
+PREPROCESSOR_PATH = MODEL_DIR / 'preprocessor.joblib'
 
 # create directories if they don't exist
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -15,3 +20,25 @@ MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
 print("Data file path:", DATA_FILE_PATH)
 print("Model file path:", MODEL_PATH)
+
+
+def forest_nodes(forest):
+    """
+    All trees of a fitted RandomForestRegressor in one structured array
+    (the forest.npy layout the API memory-maps); child indices are global, -1 marks a leaf
+    """
+    trees = [estimator.tree_ for estimator in forest.estimators_]
+    nodes = np.zeros(sum(tree.node_count for tree in trees), dtype=[
+        ('left', '<i4'), ('right', '<i4'), ('feature', '<i4'),
+        ('threshold', '<f8'), ('value', '<f8')
+    ])
+    offset = 0
+    for tree in trees:
+        block = nodes[offset:offset + tree.node_count]
+        block['left'] = np.where(tree.children_left < 0, -1, tree.children_left + offset)
+        block['right'] = np.where(tree.children_right < 0, -1, tree.children_right + offset)
+        block['feature'] = tree.feature
+        block['threshold'] = tree.threshold
+        block['value'] = tree.value[:, 0, 0]
+        offset += tree.node_count
+    return nodes